@@ -171,6 +171,13 @@ REST_FRAMEWORK = {
     ),
 }
 
+# 이 개수보다 큰 ?limit= 으로 목록을 요청하면 한 번에 렌더링하지 않고 행 단위로 스트리밍함
+# (nanuri.mixins.StreamingListMixin)
+LIST_STREAMING_THRESHOLD = 200
+
+# 스트리밍할 때 한 번에 DB 에서 불러와서 직렬화하는 행 수
+LIST_STREAMING_CHUNK_SIZE = 100
+
 
 # Logging
 
@@ -201,6 +208,18 @@ AWS_REGION = os.getenv("AWS_REGION", default="ap-northeast-2")
 AWS_SNS_PLATFORM_APPLICATION_ARN = os.environ["AWS_SNS_PLATFORM_APPLICATION_ARN"]
 
 
+# Uploads
+
+# 미리 서명된 업로드 폼을 만드는 클래스 (운영 환경은 nanuri.uploads.S3UploadBackend)
+UPLOADS_BACKEND = "nanuri.uploads.LocalUploadBackend"
+
+# 업로드 폼의 유효 시간 (초)
+UPLOADS_EXPIRES_IN = 600
+
+# 업로드할 수 있는 파일의 최대 크기 (바이트)
+UPLOADS_MAX_SIZE = 10 * 1024 * 1024
+
+
 # OpenAPI
 
 SPECTACULAR_SETTINGS = {
@@ -216,9 +235,47 @@ SPECTACULAR_SETTINGS = {
         }
     ],
     "VERSION": "1.0.0",
+    "ENUM_NAME_OVERRIDES": {
+        "UploadContentTypeEnum": "nanuri.uploads.ALLOWED_CONTENT_TYPES",
+    },
 }
 
 
+# Posts
+
+# 위치 기반 글 목록의 후보 캐시 유지 시간 (초)
+POSTS_NEARBY_FEED_CACHE_TIMEOUT = 60
+
+# 메모리에 모아둔 조회수 증가분을 DB에 반영하는 주기 (초, None 이면 자동으로 반영하지 않음)
+POSTS_VIEW_COUNT_FLUSH_INTERVAL = 5
+
+# 이미지 변형(썸네일 등)을 만드는 스레드 수 (None 이면 요청이 끝난 직후 같은 스레드에서 만듦)
+POSTS_IMAGE_WORKERS = 2
+
+# 이미지 변형 작업의 최대 대기 개수 (넘치면 작업을 버리고 process_post_images 명령으로 다시 처리함)
+POSTS_IMAGE_MAX_PENDING = 100
+
+# /posts/changes/ 의 커서를 현재 시각보다 이만큼 이전에 두어서, 늦게 커밋된 변경도 다음 요청에서 받게 함 (초)
+POSTS_CHANGES_SAFETY_WINDOW = 5
+
+# 삭제된 글(PostTombstone)을 보관하는 기간 (일, 더 오래된 커서로 요청하면 410 Gone)
+POSTS_TOMBSTONE_RETENTION_DAYS = 30
+
+# 삭제한 글의 파일을 커밋 후 백그라운드 스레드에서 지울지 여부 (False 이면 커밋 직후 같은 스레드에서 지움)
+POSTS_STORAGE_CLEANUP_IN_BACKGROUND = True
+
+# 파일 삭제에 실패했을 때 다시 시도하기까지의 기본 대기 시간 (초, 실패할 때마다 두 배로 늘어남)
+POSTS_STORAGE_CLEANUP_RETRY_DELAY = 60
+
+# 파일 삭제의 최대 시도 횟수 (넘으면 StorageDeletion 에 남겨두고 더 이상 시도하지 않음)
+POSTS_STORAGE_CLEANUP_MAX_ATTEMPTS = 8
+
+# 글 목록의 comment_count 를 계산하는 방법
+# "denormalized": signals 에서 갱신하는 Post.comment_count 컬럼을 읽음
+# "subquery": 목록 페이지의 글마다 댓글/대댓글 수를 서브쿼리로 셈 (manage.py benchmark_feed 로 비교)
+POSTS_COMMENT_COUNT_SOURCE = "denormalized"
+
+
 # Social Login
 
 KAKAO_APP_ADMIN_KEY = os.environ["KAKAO_APP_ADMIN_KEY"]
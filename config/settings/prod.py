@@ -38,6 +38,8 @@ AWS_DYNAMODB_ENDPOINT_URL = None
 DEFAULT_FILE_STORAGE = "config.storages.MediaStorage"
 STATICFILES_STORAGE = "config.storages.StaticStorage"
 
+UPLOADS_BACKEND = "nanuri.uploads.S3UploadBackend"
+
 AWS_STORAGE_BUCKET_NAME = os.environ["AWS_STORAGE_BUCKET_NAME"]
 AWS_S3_ACCESS_KEY_ID = AWS_ACCESS_KEY_ID
 AWS_S3_SECRET_ACCESS_KEY = AWS_SECRET_ACCESS_KEY
@@ -21,3 +21,7 @@ CHANNEL_LAYERS = {
 }
 
 MEDIA_ROOT = BASE_DIR / "testmedia"
+
+POSTS_VIEW_COUNT_FLUSH_INTERVAL = None
+POSTS_IMAGE_WORKERS = None
+POSTS_STORAGE_CLEANUP_IN_BACKGROUND = False
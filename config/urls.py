@@ -23,6 +23,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from nanuri.uploads import LocalUploadAPIView, LocalUploadBackend, get_upload_backend
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     # REST APIs
@@ -45,5 +47,12 @@ urlpatterns = [
     ),
 ]
 
+# 로컬/테스트 환경에서 S3 presigned POST 대신 파일을 받는 API
+# (인증 없이 저장소에 쓰기 때문에 LocalUploadBackend 를 사용할 때만 등록함)
+if isinstance(get_upload_backend(), LocalUploadBackend):
+    urlpatterns.append(
+        path("api/v1/uploads/", LocalUploadAPIView.as_view(), name="local-upload")
+    )
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,51 @@
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    Django 3.2 의 ASGIHandler 는 StreamingHttpResponse 를 이벤트 루프에서 그대로 순회하기 때문에,
+    DB 를 읽으면서 행을 만드는 제너레이터(nanuri.mixins.StreamingListMixin)는
+    SynchronousOnlyOperation 이 발생하고 그동안 다른 요청도 처리하지 못합니다.
+    스트리밍 응답은 뷰를 실행한 것과 같은 스레드에서 한 조각씩 꺼내서 보냅니다.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        response_headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            response_headers.append((bytes(header), bytes(value)))
+        for c in response.cookies.values():
+            response_headers.append(
+                (b"Set-Cookie", c.output(header="").encode("ascii").strip())
+            )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": response_headers,
+            }
+        )
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while (part := await next_part(parts, None)) is not None:
+            for chunk, _ in self.chunk_bytes(part):
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+
+def get_asgi_application():
+    """django.core.asgi.get_asgi_application 과 같지만 StreamingASGIHandler 를 반환합니다."""
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
@@ -0,0 +1,197 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .pagination import KeysetPagination
+
+
+class ConditionalGetMixin:
+    """
+    updated_at 으로 강한 ETag 와 Last-Modified 를 계산해서, 클라이언트가 가진 응답과 같으면
+    직렬화 없이 304 Not Modified 를 반환합니다.
+
+    관계를 따라가는 필드(예: `writer__updated_at`)도 `last_modified_fields` 에 넣을 수 있습니다.
+    조회수처럼 updated_at 을 바꾸지 않고 변하는 값은 ETag 에 반영되지 않습니다.
+    """
+
+    last_modified_fields = ("updated_at",)
+
+    def get_validators(self, rows, *extra):
+        """rows: [(pk, *last_modified_fields 값), ...] 로부터 (ETag, Last-Modified) 를 계산합니다."""
+        user = self.request.user
+        source = [
+            self.request.get_full_path(),
+            user.pk,
+            getattr(user, "updated_at", None),
+            *extra,
+            *rows,
+        ]
+        etag = quote_etag(md5(repr(source).encode("utf-8")).hexdigest())
+        timestamps = [value for row in rows for value in row[1:] if value is not None]
+        last_modified = max(timestamps).timestamp() if timestamps else None
+        return etag, last_modified
+
+    def get_not_modified_response(self, etag, last_modified):
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_last_modified_values(self, obj):
+        values = [obj.pk]
+        for field in self.last_modified_fields:
+            value = obj
+            for attr in field.split("__"):
+                value = getattr(value, attr) if value is not None else None
+            values.append(value)
+        return tuple(values)
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    def get(self, request, *args, **kwargs):
+        validators = None
+        if self.is_conditional_request():
+            # 객체를 불러오거나 직렬화하기 전에 updated_at 만 조회해서 먼저 비교함
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            row = (
+                self.filter_queryset(self.get_queryset())
+                .prefetch_related(None)
+                .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                .values_list("pk", *self.last_modified_fields)
+                .first()
+            )
+            if row is not None:
+                validators = self.get_validators([row])
+                if response := self.get_not_modified_response(*validators):
+                    return response
+
+        response = super().get(request, *args, **kwargs)
+        if validators is None and response.status_code == 200:
+            validators = self.get_validators(
+                [self.get_last_modified_values(self.object)]
+            )
+        if validators is not None:
+            self.set_validators(response, *validators)
+        return response
+
+    def get_object(self):
+        self.object = super().get_object()
+        return self.object
+
+    def is_conditional_request(self):
+        return any(
+            header in self.request.META
+            for header in ("HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE")
+        )
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = page if page is not None else list(queryset)
+        return self.get_conditional_list_response(objects, paginated=page is not None)
+
+    def get_conditional_list_response(self, objects, paginated=True):
+        """목록 페이지의 객체들과 페이지네이션 상태로 ETag 를 계산한 뒤 응답합니다."""
+        extra = []
+        if paginated:
+            extra = [
+                getattr(self.paginator, "count", None),
+                self.paginator.get_next_link(),
+            ]
+        rows = [self.get_last_modified_values(obj) for obj in objects]
+        etag, last_modified = self.get_validators(rows, *extra)
+        if response := self.get_not_modified_response(etag, last_modified):
+            return response
+
+        serializer = self.get_serializer(objects, many=True)
+        if paginated:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response(serializer.data)
+        return self.set_validators(response, etag, last_modified)
+
+
+class StreamingListMixin:
+    """
+    `?limit=` 이 LIST_STREAMING_THRESHOLD 보다 큰 목록은 페이지 전체를 한 번에 렌더링하지 않고
+    행 단위로 직렬화해서 StreamingHttpResponse 로 보냅니다.
+
+    페이지는 pk 와 정렬 키만 불러와서 나누고, 행은 LIST_STREAMING_CHUNK_SIZE 개씩 get_queryset() 으로
+    다시 불러오기 때문에 prefetch_related 도 청크 단위로 동작합니다.
+    (Django 3.2 의 QuerySet.iterator() 는 prefetch_related 를 무시함)
+    스트리밍 응답에는 ETag 가 없습니다.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is None or not self.should_stream():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # 잘린 QuerySet (예: ?nearest=) 은 정렬을 바꾸거나 청크로 다시 불러올 수 없으므로 그대로 렌더링함
+        if queryset.query.is_sliced:
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(self.get_page_keys_queryset(queryset))
+        if page is None:
+            return super().list(request, *args, **kwargs)
+
+        pks = [obj.pk for obj in page]
+        envelope = self.get_paginated_response([]).data
+        del envelope["results"]
+        return StreamingHttpResponse(
+            self.stream_list(pks, envelope), content_type="application/json"
+        )
+
+    def should_stream(self):
+        limit = self.paginator.get_limit(self.request)
+        return limit is not None and limit > settings.LIST_STREAMING_THRESHOLD
+
+    def get_page_keys_queryset(self, queryset):
+        # 페이지를 나누고 다음 커서를 만드는 데 필요한 필드만 불러옴 (annotation 은 그대로 계산됨)
+        field_names = {field.name for field in queryset.model._meta.concrete_fields}
+        ordering = [
+            field.lstrip("-") for field in KeysetPagination().get_ordering(self)
+        ]
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .only("pk", *[field for field in ordering if field in field_names])
+        )
+
+    def stream_list(self, pks, envelope):
+        renderer = JSONRenderer()
+        # {"count": ..., "next": ..., "results": [ 까지 먼저 보내고 행을 이어서 보냄
+        head = renderer.render(envelope)[:-1]
+        yield head + (b"," if envelope else b"") + b'"results":['
+
+        queryset = self.get_queryset().order_by()
+        chunk_size = settings.LIST_STREAMING_CHUNK_SIZE
+        separator = b""
+        for index in range(0, len(pks), chunk_size):
+            chunk = pks[index : index + chunk_size]
+            objects = queryset.in_bulk(chunk)
+            rows = [
+                renderer.render(self.get_serializer(objects[pk]).data)
+                for pk in chunk
+                if pk in objects
+            ]
+            if rows:
+                yield separator + b",".join(rows)
+                separator = b","
+        yield b"]}"
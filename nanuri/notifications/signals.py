@@ -0,0 +1,31 @@
+import logging
+
+from botocore.exceptions import BotoCoreError, ClientError
+from django.dispatch import receiver
+
+from nanuri.aws.sns import sns
+from nanuri.posts.models import Post
+from nanuri.posts.signals import post_expired
+
+from .models import Subscription
+
+logger = logging.getLogger(__name__)
+
+EXPIRED_MESSAGES = {
+    Post.OrderStatus.CANCELLED: "'{title}' 공동구매가 최소 인원을 채우지 못해 취소되었습니다.",
+    Post.OrderStatus.ORDERING: "'{title}' 공동구매 모집이 마감되어 주문을 진행합니다.",
+}
+
+
+@receiver(post_expired)
+def notify_expired_posts(sender, posts, **kwargs):
+    for post in posts:
+        try:
+            sns.publish(
+                topic=Subscription.Topic.TO_POST_PARTICIPANTS,
+                body=EXPIRED_MESSAGES[post.order_status].format(title=post.title),
+                group_code=str(post.uuid),
+            )
+        except (BotoCoreError, ClientError):
+            # 알림이 실패해도 마감 처리는 그대로 유지함
+            logger.exception("Failed to notify participants of post %s", post.uuid)
@@ -0,0 +1,193 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from datetime import datetime
+
+from django.contrib.gis.measure import Distance
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    position = []
+    for value in values:
+        if isinstance(value, Distance):
+            value = {"m": value.m}
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        position.append(value)
+    return b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(encoded):
+    try:
+        position = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+    except (TypeError, ValueError):
+        raise NotFound("Invalid cursor")
+    if not isinstance(position, list):
+        raise NotFound("Invalid cursor")
+    return [decode_cursor_value(value) for value in position]
+
+
+def decode_cursor_value(value):
+    if isinstance(value, dict):
+        # encode_cursor 가 Distance 를 {"m": <미터>} 로 저장함
+        meters = value.get("m")
+        if set(value) != {"m"} or isinstance(meters, bool):
+            raise NotFound("Invalid cursor")
+        if not isinstance(meters, (int, float)):
+            raise NotFound("Invalid cursor")
+        return Distance(m=meters)
+    if value is not None and not isinstance(value, (str, int, float)):
+        raise NotFound("Invalid cursor")
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    (created_at, id) 처럼 고유한 정렬 키를 기준으로 다음 페이지를 가져옵니다.
+    OFFSET 스캔과 COUNT(*) 쿼리가 없기 때문에 페이지가 깊어져도 비용이 일정합니다.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = api_settings.PAGE_SIZE
+    max_limit = None
+    ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(view)
+
+        queryset = queryset.order_by(*self.ordering)
+        if cursor := request.query_params.get(self.cursor_query_param):
+            position = decode_cursor(cursor)
+            if len(position) != len(self.ordering):
+                raise NotFound("Invalid cursor")
+            queryset = self.filter_position(queryset, position)
+
+        results = list(queryset[: self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.page = results[: self.limit]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_limit,
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_ordering(self, view):
+        if hasattr(view, "get_cursor_ordering"):
+            return view.get_cursor_ordering()
+        return getattr(view, "cursor_ordering", self.ordering)
+
+    def filter_position(self, queryset, position):
+        # 커서 값의 타입이 정렬 필드와 맞지 않으면 (예: created_at 자리에 날짜가 아닌 문자열)
+        # 필터를 만들 때 오류가 발생함
+        try:
+            return queryset.filter(self.get_position_filter(position))
+        except (ValidationError, KeyError, TypeError, ValueError):
+            raise NotFound("Invalid cursor")
+
+    def get_position_filter(self, position):
+        # (a, b) > (x, y) == a > x OR (a = x AND b > y)
+        position_filter = Q()
+        for index, field in enumerate(self.ordering):
+            field_name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition = Q(**{f"{field_name}__{lookup}": position[index]})
+            for previous_field, value in zip(self.ordering[:index], position):
+                condition &= Q(**{previous_field.lstrip("-"): value})
+            position_filter |= condition
+        return position_filter
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [getattr(last, field.lstrip("-")) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(values))
+
+
+class CursorOrLimitOffsetPagination(LimitOffsetPagination):
+    """
+    `cursor` 쿼리 파라미터가 있으면 KeysetPagination 으로 동작하고,
+    없으면 기존 LimitOffsetPagination 으로 동작합니다. (첫 페이지는 `?cursor=`)
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_paginator = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset_paginator is not None:
+            return None
+        return super().get_previous_link()
+
+    def get_schema_operation_parameters(self, view):
+        cursor_query_param = self.keyset_pagination_class.cursor_query_param
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Keyset pagination cursor. Pass an empty value for the first page.",
+                "schema": {
+                    "type": "string",
+                },
+            },
+        ]
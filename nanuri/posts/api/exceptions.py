@@ -0,0 +1,26 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PostParticipantsFullError(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "참여 인원이 모두 찼습니다."
+    default_code = "post_participants_full"
+
+
+class PostNotRecruitingError(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "인원을 모집 중인 글이 아닙니다."
+    default_code = "post_not_recruiting"
+
+
+class PostWriterCannotLeaveError(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "글 작성자는 참여를 취소할 수 없습니다."
+    default_code = "post_writer_cannot_leave"
+
+
+class PostChangesExpiredError(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "변경 목록을 보관하는 기간이 지났습니다. 전체 목록을 다시 불러와 주세요."
+    default_code = "post_changes_expired"
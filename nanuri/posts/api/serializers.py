@@ -1,12 +1,42 @@
 from rest_framework import serializers
 
-from nanuri.users.api.serializers import UserSerializer
+from nanuri.users.api.serializers import UserSerializer, UserSummarySerializer
 
-from ..models import Comment, Post, SubComment
+from ..images import get_variant_urls
+from ..models import Comment, Post, PostImage, SubComment
 
 
-class PostSerializer(serializers.ModelSerializer):
-    writer = UserSerializer(many=False, read_only=True)
+class ExpandableFieldsMixin:
+    # ?expand=<field> 로 요청한 필드만 전체 객체로 직렬화함
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get("expand", ())
+        for field_name, field_class in self.expandable_fields.items():
+            if field_name in expand:
+                fields[field_name] = field_class(many=False, read_only=True)
+        return fields
+
+
+class PostImageSerializer(serializers.ModelSerializer):
+    variants = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PostImage
+        fields = (
+            "uuid",
+            "image",
+            "variants",
+        )
+        read_only_fields = fields
+
+    def get_variants(self, obj) -> dict:
+        return get_variant_urls(obj.variants)
+
+
+class PostSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    writer = UserSummarySerializer(many=False, read_only=True)
     distance = serializers.CharField(max_length=255, read_only=True)
 
     participants = serializers.SlugRelatedField(
@@ -14,16 +44,22 @@ class PostSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field="email",
     )
-    favored_by = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="email",
-    )
+    # PostQuerySet.with_favorited() 로 계산한 값을 사용함
+    is_favorited = serializers.SerializerMethodField()
+    # POSTS_COMMENT_COUNT_SOURCE 에 따라 PostQuerySet.with_comment_count() 로 계산한 값을 사용함
+    comment_count = serializers.SerializerMethodField()
     images = serializers.SlugRelatedField(
         many=True,
         read_only=True,
         slug_field="image_url",
     )
+    # 변형이 아직 만들어지지 않았으면 빈 객체를 반환함 (원본 image 를 사용)
+    image_variants = serializers.SerializerMethodField()
+    post_images = PostImageSerializer(source="images", many=True, read_only=True)
+
+    expandable_fields = {
+        "writer": UserSerializer,
+    }
 
     class Meta:
         model = Post
@@ -32,6 +68,7 @@ class PostSerializer(serializers.ModelSerializer):
             "title",
             "category",
             "image",
+            "image_variants",
             "unit_price",
             "quantity",
             "description",
@@ -44,22 +81,74 @@ class PostSerializer(serializers.ModelSerializer):
             "is_published",
             "published_at",
             "view_count",
+            "favorite_count",
+            "comment_count",
             "waited_from",
             "waited_until",
+            "location",
             "created_at",
             "updated_at",
             "writer",
             "distance",
             "participants",
-            "favored_by",
+            "is_favorited",
             "images",
+            "post_images",
         )
         extra_kwargs = {
             "num_participants": {"read_only": True},
             "published_at": {"read_only": True},
             "view_count": {"read_only": True},
+            "favorite_count": {"read_only": True},
         }
 
+    def get_is_favorited(self, obj) -> bool:
+        return getattr(obj, "is_favorited", False)
+
+    def get_comment_count(self, obj) -> int:
+        return getattr(obj, "annotated_comment_count", obj.comment_count)
+
+    def get_image_variants(self, obj) -> dict:
+        return get_variant_urls(obj.image_variants)
+
+
+class PostParticipationSerializer(serializers.Serializer):
+    uuid = serializers.UUIDField(read_only=True)
+    num_participants = serializers.IntegerField(read_only=True)
+    max_participants = serializers.IntegerField(read_only=True)
+    is_participating = serializers.BooleanField(read_only=True)
+
+
+class PostFavoriteSerializer(serializers.Serializer):
+    uuid = serializers.UUIDField(read_only=True)
+    favorite_count = serializers.IntegerField(read_only=True)
+    is_favorited = serializers.BooleanField(read_only=True)
+
+
+class PostBulkRequestSerializer(serializers.Serializer):
+    uuids = serializers.ListField(
+        child=serializers.UUIDField(), min_length=1, max_length=500
+    )
+
+
+class PostBulkSerializer(serializers.Serializer):
+    results = PostSerializer(many=True, read_only=True)
+    missing = serializers.ListField(child=serializers.UUIDField(), read_only=True)
+
+
+class PostChangesSerializer(serializers.Serializer):
+    posts = PostSerializer(many=True, read_only=True)
+    deleted = serializers.ListField(child=serializers.UUIDField(), read_only=True)
+    cursor = serializers.CharField(read_only=True)
+    has_more = serializers.BooleanField(read_only=True)
+
+
+class PostUploadConfirmSerializer(serializers.Serializer):
+    image = serializers.CharField(required=False)
+    images = serializers.ListField(
+        child=serializers.CharField(), required=False, max_length=10
+    )
+
 
 class CommentSerializer(serializers.ModelSerializer):
     post = serializers.SlugRelatedField(
@@ -107,3 +196,13 @@ class SubCommentSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         )
+
+
+class ThreadedCommentSerializer(CommentSerializer):
+    sub_comments = SubCommentSerializer(
+        source="sub_comments_page", many=True, read_only=True
+    )
+    more_sub_comments = serializers.URLField(read_only=True, allow_null=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ("sub_comments", "more_sub_comments")
@@ -1,5 +1,26 @@
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema
 
+from nanuri.uploads import UploadRequestSerializer, UploadSerializer
+
+from .serializers import (
+    PostBulkRequestSerializer,
+    PostBulkSerializer,
+    PostChangesSerializer,
+    PostFavoriteSerializer,
+    PostParticipationSerializer,
+    PostSerializer,
+    PostUploadConfirmSerializer,
+    ThreadedCommentSerializer,
+)
+
+expand_parameter = OpenApiParameter(
+    name="expand",
+    location=OpenApiParameter.QUERY,
+    description="전체 객체로 펼쳐서 받을 필드 (예: `writer`). 기본값은 요약 정보입니다.",
+    required=False,
+    type=str,
+)
+
 posts_api_specs = {
     "get": extend_schema(
         description="<h2>상품 정보를 불러오는 API</h2>",
@@ -13,6 +34,18 @@ posts_api_specs = {
                 required=False,
                 type=str,
             ),
+            OpenApiParameter(
+                name="order_status",
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "주문 상태로 필터링 (여러 번 지정 가능). "
+                    "지정하지 않으면 모집 중(`WAITING`)인 글만 반환하고, "
+                    "`user` 와 함께 사용하면 모든 상태의 글을 반환합니다."
+                ),
+                required=False,
+                type=str,
+                many=True,
+            ),
             OpenApiParameter(
                 name="distance",
                 location=OpenApiParameter.QUERY,
@@ -20,6 +53,38 @@ posts_api_specs = {
                 required=False,
                 type=int,
             ),
+            OpenApiParameter(
+                name="q",
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "제목과 본문에서 검색할 검색어. 관련도 순으로 정렬되며, "
+                    "`distance` 와 함께 사용하면 거리순으로 정렬됩니다."
+                ),
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="search_mode",
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "`fulltext` (기본값): 제목과 본문 전문 검색, 관련도순 / "
+                    "`ngram`: 제목 부분 일치 검색 (띄어쓰기 없는 한글 상품명용), 최신순"
+                ),
+                required=False,
+                type=str,
+                enum=["fulltext", "ngram"],
+            ),
+            OpenApiParameter(
+                name="nearest",
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "현재 위치에서 가장 가까운 게시글 N개(최대 100개)를 거리순으로 반환합니다. "
+                    "이 경우 페이지네이션 없이 목록으로 응답합니다."
+                ),
+                required=False,
+                type=int,
+            ),
+            expand_parameter,
         ],
     ),
     "post": extend_schema(
@@ -46,11 +111,13 @@ posts_api_specs = {
             OpenApiExample(
                 name="Response #1",
                 value={
-                    "writer": "nanuri@nanuri.app",
-                    "writer_address": "나누리시 나누리구 나누리동 나누리아파트 101동 101호",
-                    "writer_nickname": "나누리",
+                    "writer": {
+                        "uuid": "0f5c4c1e-8a5b-4f7e-9a54-0c8f0c7a52a1",
+                        "nickname": "나누리",
+                        "profile": None,
+                    },
                     "participants": ["nanuri@nanuri.app"],
-                    "favored_by": [],
+                    "is_favorited": False,
                     "images": [],
                     "uuid": "b6accf2d-f527-4096-bcf2-3a18198db198",
                     "title": "콜라 공동구매합니다",
@@ -68,6 +135,7 @@ posts_api_specs = {
                     "is_published": True,
                     "published_at": "2022-08-02T13:13:08.095902Z",
                     "view_count": 0,
+                    "favorite_count": 0,
                     "waited_from": "2022-08-02",
                     "waited_until": "2022-08-05",
                     "created_at": "2022-08-02T13:13:08.309620Z",
@@ -80,19 +148,77 @@ posts_api_specs = {
 }
 
 
+update_images_description = (
+    "`images` 나 `kept_images` 를 보내면 첨부 이미지를 바꿉니다. "
+    "`kept_images` (유지할 이미지 uuid 목록) 에 있거나 `images` 로 다시 보낸 파일과 "
+    "내용이 같은 기존 이미지는 그대로 두고, 나머지 기존 이미지는 삭제합니다. "
+    "둘 다 보내지 않으면 첨부 이미지는 바뀌지 않습니다."
+)
+
+post_bulk_api_specs = {
+    "post": extend_schema(
+        description=(
+            "<h2>여러 글을 uuid 목록으로 한 번에 불러오는 API</h2>"
+            "최대 500개의 uuid 를 받아서 요청한 순서대로 반환하고, "
+            "삭제되었거나 없는 글의 uuid 는 `missing` 에 담습니다."
+        ),
+        summary="Return posts by uuid list",
+        tags=["Post"],
+        parameters=[expand_parameter],
+        request=PostBulkRequestSerializer,
+        responses=PostBulkSerializer,
+    ),
+}
+
+
+post_changes_api_specs = {
+    "get": extend_schema(
+        description=(
+            "<h2>마지막으로 동기화한 이후에 바뀐 글을 불러오는 API</h2>"
+            "생성/수정된 글은 `posts` 에 수정 시각 순으로, 삭제된 글은 `deleted` 에 uuid 로 담깁니다. "
+            "응답의 `cursor` 를 저장해 두었다가 다음 요청의 `since` 로 보내고, "
+            "`has_more` 가 true 이면 바로 다시 요청합니다. "
+            "같은 글이 두 번 이상 올 수 있으므로 uuid 기준으로 덮어쓰면 됩니다. "
+            "보관 기간이 지난 커서로 요청하면 410 을 반환하므로 전체 목록을 다시 불러와야 합니다."
+        ),
+        summary="Return posts changed since the cursor",
+        tags=["Post"],
+        parameters=[
+            OpenApiParameter(
+                name="since",
+                location=OpenApiParameter.QUERY,
+                description="이전 응답의 cursor (없으면 처음부터)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="limit",
+                location=OpenApiParameter.QUERY,
+                description="한 번에 받을 최대 글 수 (기본 100, 최대 500)",
+                required=False,
+                type=int,
+            ),
+            expand_parameter,
+        ],
+        responses=PostChangesSerializer,
+    ),
+}
+
+
 post_api_specs = {
     "get": extend_schema(
         description="<h2>상품 게시글 정보를 불러오는 API</h2>",
         summary="Return post by post uuid",
         tags=["Post"],
+        parameters=[expand_parameter],
     ),
     "put": extend_schema(
-        description="<h2>상품 게시글의 전체를 업데이트 하는 API</h2>",
+        description="<h2>상품 게시글의 전체를 업데이트 하는 API</h2>" + update_images_description,
         summary="Update post",
         tags=["Post"],
     ),
     "patch": extend_schema(
-        description="<h2>상품 게시글을 업데이트 하는 API</h2>",
+        description="<h2>상품 게시글을 업데이트 하는 API</h2>" + update_images_description,
         summary="Update post",
         tags=["Post"],
     ),
@@ -104,6 +230,115 @@ post_api_specs = {
 }
 
 
+post_participants_api_specs = {
+    "post": extend_schema(
+        description=(
+            "<h2>공동구매에 참여하는 API</h2>"
+            "이미 참여한 경우에는 아무것도 바꾸지 않습니다. "
+            "인원이 모두 찼거나 모집 중이 아니면 409 를 반환합니다."
+        ),
+        summary="Join a post",
+        tags=["Post"],
+        request=None,
+        responses=PostParticipationSerializer,
+    ),
+    "delete": extend_schema(
+        description="<h2>공동구매 참여를 취소하는 API</h2>",
+        summary="Leave a post",
+        tags=["Post"],
+        request=None,
+        responses=PostParticipationSerializer,
+    ),
+}
+
+
+post_favorite_api_specs = {
+    "post": extend_schema(
+        description="<h2>글을 즐겨찾기에 추가하는 API</h2>",
+        summary="Favorite a post",
+        tags=["Post"],
+        request=None,
+        responses=PostFavoriteSerializer,
+    ),
+    "delete": extend_schema(
+        description="<h2>글을 즐겨찾기에서 삭제하는 API</h2>",
+        summary="Unfavorite a post",
+        tags=["Post"],
+        request=None,
+        responses=PostFavoriteSerializer,
+    ),
+}
+
+
+post_uploads_api_specs = {
+    "post": extend_schema(
+        description=(
+            "<h2>글 이미지를 저장소에 바로 올릴 수 있는 업로드 폼을 만드는 API</h2>"
+            "응답의 `fields` 와 `file` 을 multipart/form-data 로 `url` 에 POST 한 뒤 "
+            "`/posts/{uuid}/uploads/confirm/` 에 `key` 를 보내서 글에 연결합니다. "
+            "글 작성자만 사용할 수 있습니다."
+        ),
+        summary="Create presigned uploads for post images",
+        tags=["Post"],
+        request=UploadRequestSerializer,
+        responses=UploadSerializer(many=True),
+    ),
+}
+
+
+post_upload_confirm_api_specs = {
+    "post": extend_schema(
+        description=(
+            "<h2>업로드한 이미지를 글에 연결하는 API</h2>"
+            "`image` 는 대표 이미지를 바꾸고, `images` 는 첨부 이미지로 추가합니다."
+        ),
+        summary="Attach uploaded images to a post",
+        tags=["Post"],
+        request=PostUploadConfirmSerializer,
+        responses=PostSerializer,
+    ),
+}
+
+
+post_comments_api_specs = {
+    "get": extend_schema(
+        description=(
+            "<h2>글의 댓글을 대댓글과 함께 불러오는 API</h2>"
+            "댓글과 대댓글 모두 오래된 순서로 반환합니다. "
+            "댓글마다 대댓글은 최대 `sub_comments_limit` 개까지 담기고, "
+            "더 있으면 `more_sub_comments` 의 URL(대댓글 목록 API)로 나머지를 불러올 수 있습니다."
+        ),
+        summary="Return comments of a post with their sub-comments",
+        operation_id="api_v1_posts_comments_thread",
+        tags=["Comment"],
+        parameters=[
+            OpenApiParameter(
+                name="cursor",
+                location=OpenApiParameter.QUERY,
+                description="이전 응답의 next 에 담긴 커서",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="limit",
+                location=OpenApiParameter.QUERY,
+                description="한 번에 받을 댓글 수",
+                required=False,
+                type=int,
+            ),
+            OpenApiParameter(
+                name="sub_comments_limit",
+                location=OpenApiParameter.QUERY,
+                description="댓글마다 함께 받을 대댓글 수 (기본 3, 최대 20)",
+                required=False,
+                type=int,
+            ),
+        ],
+        responses=ThreadedCommentSerializer(many=True),
+    ),
+}
+
+
 comments_api_specs = {
     "get": extend_schema(
         description="<h2>댓글 목록을 조회하는 API</h2>",
@@ -116,7 +351,15 @@ comments_api_specs = {
                 description="Post UUID",
                 required=False,
                 type=str,
-            )
+            ),
+            OpenApiParameter(
+                name="ordering",
+                location=OpenApiParameter.QUERY,
+                description="`oldest` (기본값): 오래된 순서 / `newest`: 최신순",
+                required=False,
+                type=str,
+                enum=["oldest", "newest"],
+            ),
         ],
     ),
     "post": extend_schema(
@@ -163,7 +406,15 @@ sub_comments_api_specs = {
                 description="Comment UUID",
                 required=False,
                 type=str,
-            )
+            ),
+            OpenApiParameter(
+                name="ordering",
+                location=OpenApiParameter.QUERY,
+                description="`oldest` (기본값): 오래된 순서 / `newest`: 최신순",
+                required=False,
+                type=str,
+                enum=["oldest", "newest"],
+            ),
         ],
     ),
     "post": extend_schema(
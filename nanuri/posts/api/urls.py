@@ -10,11 +10,46 @@ urlpatterns = [
         views.PostListCreateAPIView.as_view(),
         name="list",
     ),
+    path(
+        "bulk/",
+        views.PostBulkRetrieveAPIView.as_view(),
+        name="bulk",
+    ),
+    path(
+        "changes/",
+        views.PostChangesAPIView.as_view(),
+        name="changes",
+    ),
     path(
         "<uuid:uuid>/",
         views.PostRetrieveUpdateDestroyAPIView.as_view(),
         name="detail",
     ),
+    path(
+        "<uuid:uuid>/participants/",
+        views.PostParticipantsAPIView.as_view(),
+        name="participants",
+    ),
+    path(
+        "<uuid:uuid>/favorite/",
+        views.PostFavoriteAPIView.as_view(),
+        name="favorite",
+    ),
+    path(
+        "<uuid:uuid>/comments/",
+        views.PostCommentThreadAPIView.as_view(),
+        name="comment-thread",
+    ),
+    path(
+        "<uuid:uuid>/uploads/",
+        views.PostUploadsAPIView.as_view(),
+        name="uploads",
+    ),
+    path(
+        "<uuid:uuid>/uploads/confirm/",
+        views.PostUploadConfirmAPIView.as_view(),
+        name="upload-confirm",
+    ),
     path(
         "comments/",
         views.CommentListCreateAPIView.as_view(),
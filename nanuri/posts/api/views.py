@@ -1,89 +1,808 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.measure import D
-from django.core.files.storage import default_storage
-from django.db.models import F
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Prefetch, Subquery
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from drf_spectacular.utils import extend_schema_view
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.generics import (
+    GenericAPIView,
+    ListAPIView,
+    ListCreateAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
+from rest_framework.pagination import _positive_int
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from nanuri.mixins import (
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    StreamingListMixin,
+)
+from nanuri.pagination import (
+    CursorOrLimitOffsetPagination,
+    KeysetPagination,
+    decode_cursor,
+    encode_cursor,
+)
+from nanuri.uploads import (
+    UploadRequestSerializer,
+    UploadSerializer,
+    create_uploads,
+    validate_uploaded_keys,
+)
 
-from ..models import Comment, Post, PostImage, SubComment
+from ..cache import nearby_feed_cache
+from ..counters import view_count_buffer
+from ..images import image_pipeline
+from ..models import Comment, Post, PostImage, PostTombstone, SubComment
+from ..storage import get_content_hash, release_images_on_commit, storing_images
 from . import specs
-from .serializers import CommentSerializer, PostSerializer, SubCommentSerializer
+from .exceptions import (
+    PostChangesExpiredError,
+    PostNotRecruitingError,
+    PostParticipantsFullError,
+    PostWriterCannotLeaveError,
+)
+from .serializers import (
+    CommentSerializer,
+    PostBulkRequestSerializer,
+    PostBulkSerializer,
+    PostChangesSerializer,
+    PostFavoriteSerializer,
+    PostParticipationSerializer,
+    PostSerializer,
+    PostUploadConfirmSerializer,
+    SubCommentSerializer,
+    ThreadedCommentSerializer,
+)
+
+
+class PostExpandMixin:
+    def get_expand(self):
+        expand = self.request.query_params.get("expand", default="")
+        return {field_name for field_name in expand.split(",") if field_name}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand()
+        return context
+
+
+MAX_NEAREST_POSTS = 100
+
+# /posts/<uuid>/comments/ 에서 댓글마다 함께 반환하는 대댓글 수
+DEFAULT_SUB_COMMENTS_LIMIT = 3
+MAX_SUB_COMMENTS_LIMIT = 20
+
+# /posts/changes/ 한 번에 반환하는 글 수
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 500
+
+# fulltext: 제목 + 본문 전문 검색 (관련도순), ngram: 제목 부분 일치 검색 (최신순)
+SEARCH_MODES = ("fulltext", "ngram")
+
+# 댓글/대댓글 목록의 ?ordering= (부모, created_at, id) 인덱스 순서와 같음
+COMMENT_ORDERINGS = {
+    "oldest": ("created_at", "id"),
+    "newest": ("-created_at", "-id"),
+}
+
+# 이 파라미터들만으로 이루어진 반경 검색 요청은 캐시된 후보 목록으로 응답함
+NEARBY_FEED_CACHE_PARAMS = {"distance", "category", "limit", "offset", "expand"}
 
 
 @extend_schema_view(**specs.posts_api_specs)
-class PostListCreateAPIView(ListCreateAPIView):
+class PostListCreateAPIView(
+    StreamingListMixin, ConditionalListMixin, PostExpandMixin, ListCreateAPIView
+):
     permission_classes = [IsAuthenticated]
     serializer_class = PostSerializer
+    pagination_class = CursorOrLimitOffsetPagination
+    last_modified_fields = ("updated_at", "writer__updated_at")
 
     def get_queryset(self):
-        queryset = Post.objects.all()
+        queryset = (
+            Post.objects.with_related(expand_writer="writer" in self.get_expand())
+            .with_favorited(self.request.user)
+            .order_by("-created_at", "-id")
+        )
 
         if location := self.request.user.location:
-            queryset = queryset.annotate(
-                distance=Distance(F("writer__location"), location)
-            )
+            queryset = queryset.annotate(distance=Distance(F("location"), location))
 
         if user := self.request.query_params.get("user"):
             queryset = queryset.filter(writer__uuid=user)
 
+        # 기본 피드에는 모집 중인 글만 보여줌 (작성자별 목록은 모든 글을 보여줌)
+        if statuses := self.get_order_statuses():
+            queryset = queryset.filter(order_status__in=statuses)
+        elif not user:
+            queryset = queryset.recruiting()
+
+        if query := self.get_search_query():
+            if self.get_search_mode() == "ngram":
+                queryset = queryset.search_title(query)
+            else:
+                queryset = queryset.search(query).order_by("-rank", "-id")
+
         if distance := self.request.query_params.get("distance"):
-            queryset = queryset.filter(distance__lt=D(m=distance)).order_by("distance")
+            queryset = queryset.within(location, self.get_distance(distance)).order_by(
+                "distance"
+            )
 
         if categories := self.request.query_params.getlist("category"):
             queryset = queryset.filter(category__in=categories)
 
+        if nearest := self.request.query_params.get("nearest"):
+            queryset = queryset.nearest(location, self.get_nearest_count(nearest))
+
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        if self.can_use_nearby_feed_cache():
+            return self.list_nearby_posts()
+        return super().list(request, *args, **kwargs)
+
+    def can_use_nearby_feed_cache(self):
+        location = self.request.user.location
+        if (
+            not location
+            or not set(self.request.query_params) <= NEARBY_FEED_CACHE_PARAMS
+        ):
+            return False
+        try:
+            distance = float(self.request.query_params.get("distance", ""))
+        except ValueError:
+            return False
+        return distance > 0 and nearby_feed_cache.is_cacheable(location, distance)
+
+    def list_nearby_posts(self):
+        nearby = nearby_feed_cache.get_nearby(
+            Post.objects.recruiting(),
+            self.request.user.location,
+            float(self.request.query_params["distance"]),
+            self.request.query_params.getlist("category"),
+        )
+        page = self.paginate_queryset(nearby)
+        posts = (
+            Post.objects.with_related(expand_writer="writer" in self.get_expand())
+            .with_favorited(self.request.user)
+            .in_bulk([post_id for post_id, _ in page])
+        )
+        results = []
+        for post_id, meters in page:
+            if post := posts.get(post_id):
+                post.distance = D(m=meters)
+                results.append(post)
+        return self.get_conditional_list_response(results)
+
+    def get_distance(self, distance):
+        # nearest 와 같이 위치가 없거나 잘못된 값이면 400 을 반환함
+        if not self.request.user.location:
+            raise ValidationError({"distance": "User location is not set."})
+        try:
+            distance = float(distance)
+        except ValueError:
+            distance = None
+        if distance is None or not math.isfinite(distance) or distance <= 0:
+            raise ValidationError({"distance": "A positive number is required."})
+        return distance
+
+    def get_nearest_count(self, nearest):
+        if not self.request.user.location:
+            raise ValidationError({"nearest": "User location is not set."})
+        try:
+            return _positive_int(nearest, strict=True, cutoff=MAX_NEAREST_POSTS)
+        except ValueError:
+            raise ValidationError({"nearest": "A positive integer is required."})
+
+    def get_order_statuses(self):
+        statuses = self.request.query_params.getlist("order_status")
+        if invalid := set(statuses) - set(Post.OrderStatus.values):
+            raise ValidationError(
+                {"order_status": f"Invalid status: {sorted(invalid)}"}
+            )
+        return statuses
+
+    def get_search_query(self):
+        return self.request.query_params.get("q", "").strip()
+
+    def get_search_mode(self):
+        search_mode = self.request.query_params.get("search_mode", "fulltext")
+        if search_mode not in SEARCH_MODES:
+            raise ValidationError(
+                {"search_mode": f"Must be one of: {', '.join(SEARCH_MODES)}."}
+            )
+        return search_mode
+
+    def paginate_queryset(self, queryset):
+        # nearest 모드에서는 가까운 N개의 글을 페이지 나누지 않고 한 번에 반환함
+        if self.request.query_params.get("nearest"):
+            return None
+        return super().paginate_queryset(queryset)
+
+    def get_cursor_ordering(self):
+        if self.request.query_params.get("distance"):
+            return ("distance", "id")
+        if self.get_search_query() and self.get_search_mode() == "fulltext":
+            return ("-rank", "-id")
+        return ("-created_at", "-id")
+
     def perform_create(self, serializer):
         writer = self.request.user
-        post = serializer.save(writer=writer)
-        post_images = [
-            PostImage(post=post, image=image_file)
-            for image_file in self.request.FILES.getlist("images")
+        location = serializer.validated_data.get("location") or writer.location
+        image = serializer.validated_data.pop("image", None)
+        # 이미지는 내용 주소로 저장해서 같은 파일을 여러 번 올리지 않음
+        # 저장소에 올리는 동안 트랜잭션(과 ImageBlob 행 잠금)을 잡지 않도록 파일을 먼저 올리고 행은 나중에 만듦
+        with storing_images() as store:
+            image_name = store(image) if image else None
+            post_images = []
+            for image_file in self.request.FILES.getlist("images"):
+                content_hash = get_content_hash(image_file)
+                post_images.append(
+                    PostImage(
+                        image=store(image_file, content_hash),
+                        content_hash=content_hash,
+                    )
+                )
+            with transaction.atomic():
+                post = serializer.save(
+                    writer=writer,
+                    location=location,
+                    num_participants=1,
+                    image=image_name,
+                )
+                for post_image in post_images:
+                    post_image.post = post
+                PostImage.objects.bulk_create(post_images)
+                post.participants.add(writer)
+        image_pipeline.enqueue(post.pk)
+
+
+@extend_schema_view(**specs.post_bulk_api_specs)
+class PostBulkRetrieveAPIView(PostExpandMixin, GenericAPIView):
+    """캐시한 즐겨찾기/채팅방 글처럼 uuid 를 알고 있는 글들을 한 번의 조회로 불러옵니다."""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = PostBulkSerializer
+
+    def get_queryset(self):
+        # 목록 API 와 같은 prefetch 를 사용함
+        queryset = Post.objects.with_related(
+            expand_writer="writer" in self.get_expand()
+        ).with_favorited(self.request.user)
+        if location := self.request.user.location:
+            queryset = queryset.annotate(distance=Distance(F("location"), location))
+        return queryset
+
+    def post(self, request):
+        serializer = PostBulkRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uuids = list(dict.fromkeys(serializer.validated_data["uuids"]))
+
+        posts = {post.uuid: post for post in self.get_queryset().filter(uuid__in=uuids)}
+        serializer = self.get_serializer(
+            {
+                "results": [posts[uuid] for uuid in uuids if uuid in posts],
+                "missing": [uuid for uuid in uuids if uuid not in posts],
+            }
+        )
+        return Response(serializer.data)
+
+
+@extend_schema_view(**specs.post_changes_api_specs)
+class PostChangesAPIView(PostExpandMixin, GenericAPIView):
+    """
+    글과 삭제 기록(PostTombstone)을 각각 (수정 시각, id) 순서로 읽고,
+    두 위치를 하나의 커서 `[updated_at, id, deleted_at, id]` 로 묶어서 반환합니다.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = PostChangesSerializer
+    post_ordering = ("updated_at", "id")
+    tombstone_ordering = ("deleted_at", "id")
+
+    def get_queryset(self):
+        return Post.objects.with_related(
+            expand_writer="writer" in self.get_expand()
+        ).with_favorited(self.request.user)
+
+    def get(self, request):
+        limit = self.get_limit()
+        # 늦게 커밋된 변경을 놓치지 않도록 커서를 이 시각 이후로는 옮기지 않음
+        safe_position = [
+            timezone.now() - timedelta(seconds=settings.POSTS_CHANGES_SAFETY_WINDOW),
+            0,
         ]
-        PostImage.objects.bulk_create(post_images)
-        post.participants.add(writer)
+        post_position, tombstone_position = self.get_positions(safe_position)
+
+        posts, has_more_posts = self.get_changes(
+            self.get_queryset(), self.post_ordering, post_position, limit
+        )
+        tombstones, has_more_tombstones = self.get_changes(
+            PostTombstone.objects.all(),
+            self.tombstone_ordering,
+            tombstone_position,
+            limit,
+        )
+
+        cursor = encode_cursor(
+            [
+                *self.get_next_position(
+                    posts,
+                    self.post_ordering,
+                    safe_position,
+                    has_more_posts,
+                ),
+                *self.get_next_position(
+                    tombstones,
+                    self.tombstone_ordering,
+                    safe_position,
+                    has_more_tombstones,
+                ),
+            ]
+        )
+        serializer = self.get_serializer(
+            {
+                "posts": posts,
+                "deleted": [tombstone.uuid for tombstone in tombstones],
+                "cursor": cursor,
+                "has_more": has_more_posts or has_more_tombstones,
+            }
+        )
+        return Response(serializer.data)
+
+    def get_limit(self):
+        try:
+            return _positive_int(
+                self.request.query_params["limit"],
+                strict=True,
+                cutoff=MAX_CHANGES_LIMIT,
+            )
+        except (KeyError, ValueError):
+            return DEFAULT_CHANGES_LIMIT
+
+    def get_positions(self, safe_position):
+        since = self.request.query_params.get("since")
+        if not since:
+            # 처음 동기화할 때는 모든 글을 받고, 그 이전에 삭제된 글은 받을 필요가 없음
+            return None, safe_position
+
+        position = decode_cursor(since)
+        if len(position) != 4:
+            raise NotFound("Invalid cursor")
+        try:
+            updated_at, post_id, deleted_at, tombstone_id = position
+            updated_at = parse_datetime(updated_at) if updated_at else None
+            deleted_at = parse_datetime(deleted_at)
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor")
+        if deleted_at is None:
+            raise NotFound("Invalid cursor")
+
+        retention = timedelta(days=settings.POSTS_TOMBSTONE_RETENTION_DAYS)
+        if deleted_at < timezone.now() - retention:
+            raise PostChangesExpiredError()
+        post_position = [updated_at, post_id] if updated_at else None
+        return post_position, [deleted_at, tombstone_id]
+
+    def get_changes(self, queryset, ordering, position, limit):
+        paginator = KeysetPagination()
+        paginator.ordering = ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = paginator.filter_position(queryset, position)
+        results = list(queryset[: limit + 1])
+        return results[:limit], len(results) > limit
+
+    def get_next_position(self, results, ordering, safe_position, has_more):
+        if has_more:
+            return [getattr(results[-1], field) for field in ordering]
+        # safe_position 까지는 모두 읽었으므로 새로 바뀐 행이 없어도 커서를 옮김
+        # (삭제된 글이 없어도 삭제 기록 위치가 보관 기간을 넘겨 만료되지 않음)
+        return safe_position
 
 
 @extend_schema_view(**specs.post_api_specs)
-class PostRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+class PostRetrieveUpdateDestroyAPIView(
+    ConditionalRetrieveMixin, PostExpandMixin, RetrieveUpdateDestroyAPIView
+):
     permission_classes = [IsAuthenticated]
-    queryset = Post.objects.all()
     serializer_class = PostSerializer
     lookup_field = "uuid"
+    last_modified_fields = ("updated_at", "writer__updated_at")
+
+    def get_queryset(self):
+        return Post.objects.with_related(
+            expand_writer="writer" in self.get_expand()
+        ).with_favorited(self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        # 304 Not Modified 응답은 조회수에 포함하지 않음 (ConditionalRetrieveMixin)
+        # 조회수는 버퍼에 모아뒀다가 주기적으로 반영함
+        view_count_buffer.add(instance.pk)
+        instance.view_count += view_count_buffer.get_pending(instance.pk)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    @transaction.atomic
     def perform_destroy(self, instance):
-        for post_image in instance.images.all():
-            default_storage.delete(post_image.image.name)
-        default_storage.delete(instance.image.name)
+        # 이미지는 signals 에서 놓아주고, 파일은 커밋 후 백그라운드에서 한 번에 지움
         super().perform_destroy(instance)
 
     def perform_update(self, serializer):
-        super().perform_update(serializer)
-        uuid = self.kwargs[self.lookup_field]
-        post = Post.objects.get(uuid=uuid)
-        post_images = post.images.all()
+        instance = serializer.instance
+        image_changed = "image" in serializer.validated_data
+        # 이미지 필드가 요청에 있을 때만 첨부 이미지를 바꿈 (제목만 수정하는 경우 등은 그대로 둠)
+        images_changed = (
+            "images" in self.request.data or "kept_images" in self.request.data
+        )
+        # perform_create 와 같이 파일을 먼저 올리고 트랜잭션에서는 행만 바꿈
+        with storing_images() as store:
+            if image_changed:
+                image = serializer.validated_data.pop("image")
+                name = store(image) if image else None
+            if images_changed:
+                removed_ids, new_post_images = self.store_post_images(instance, store)
+            with transaction.atomic():
+                if image_changed:
+                    # 대표 이미지가 바뀌면 이전 이미지를 놓아주고 변형을 새로 만듦
+                    previous = (instance.image.name, instance.image_variants)
+                    serializer.save(
+                        image=name,
+                        image_variants=previous[1] if name == previous[0] else {},
+                    )
+                    release_images_on_commit([previous])
+                else:
+                    super().perform_update(serializer)
+                if images_changed:
+                    self.update_post_images(removed_ids, new_post_images)
+        if image_changed or images_changed:
+            image_pipeline.enqueue(instance.pk)
+
+    def store_post_images(self, post, store):
+        """
+        `kept_images` 의 uuid 또는 내용(SHA-256)이 같은 기존 이미지는 그대로 두고 새 이미지만 올립니다.
+        (빠진 이미지 id 목록, 새 PostImage 목록) 을 반환합니다.
+        """
+        data = self.request.data
+        if hasattr(data, "getlist"):
+            kept_uuids = set(data.getlist("kept_images"))
+        else:
+            kept_uuids = set(data.get("kept_images") or [])
+
+        post_images = list(PostImage.objects.filter(post=post).order_by("id"))
+        kept_ids = {
+            post_image.pk
+            for post_image in post_images
+            if str(post_image.uuid) in kept_uuids
+        }
+        post_images_by_hash = {}
         for post_image in post_images:
-            default_storage.delete(post_image.image.name)
-            post_image.delete()
-        new_post_images = [
-            PostImage(post=post, image=image_file)
-            for image_file in self.request.FILES.getlist("images")
+            if post_image.content_hash and post_image.pk not in kept_ids:
+                post_images_by_hash.setdefault(post_image.content_hash, []).append(
+                    post_image
+                )
+
+        new_post_images = []
+        for image_file in self.request.FILES.getlist("images"):
+            content_hash = get_content_hash(image_file)
+            if same_post_images := post_images_by_hash.get(content_hash):
+                kept_ids.add(same_post_images.pop(0).pk)
+                continue
+            new_post_images.append(
+                PostImage(
+                    post=post,
+                    image=store(image_file, content_hash),
+                    content_hash=content_hash,
+                )
+            )
+
+        removed_ids = [
+            post_image.pk for post_image in post_images if post_image.pk not in kept_ids
         ]
-        PostImage.objects.bulk_create(new_post_images)
+        return removed_ids, new_post_images
+
+    def update_post_images(self, removed_ids, new_post_images):
+        """빠진 이미지는 한 번에 지우고 새 이미지를 한 번에 추가합니다."""
+        if removed_ids:
+            # 빠진 이미지의 파일은 signals 에서 커밋 후에 한 번에 놓아줌
+            PostImage.objects.filter(pk__in=removed_ids).delete()
+        if new_post_images:
+            PostImage.objects.bulk_create(new_post_images)
+
+
+@extend_schema_view(**specs.post_participants_api_specs)
+class PostParticipantsAPIView(APIView):
+    """
+    참여/참여 취소는 participants 의 through 테이블과 num_participants 를 한 트랜잭션에서 함께 바꿉니다.
+    through 테이블을 직접 사용하기 때문에 m2m_changed 대신 updated_at 을 직접 갱신합니다.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, uuid):
+        post = get_object_or_404(Post, uuid=uuid)
+        if post.participants.filter(pk=request.user.pk).exists():
+            return self.get_response(post)
+
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                # 남은 자리가 있을 때만 인원 수를 늘리는 조건부 UPDATE 로 초과 참여를 막음
+                # (행 잠금은 이 짧은 트랜잭션이 끝날 때까지만 유지됨)
+                joined = Post.objects.filter(
+                    pk=post.pk,
+                    order_status=Post.OrderStatus.WAITING,
+                    num_participants__lt=F("max_participants"),
+                ).update(num_participants=F("num_participants") + 1, updated_at=now)
+                if not joined:
+                    post.refresh_from_db(fields=["order_status"])
+                    if post.order_status != Post.OrderStatus.WAITING:
+                        raise PostNotRecruitingError()
+                    raise PostParticipantsFullError()
+                Post.participants.through.objects.create(
+                    post_id=post.pk, user_id=request.user.pk
+                )
+                get_user_model().objects.filter(pk=request.user.pk).update(
+                    updated_at=now
+                )
+        except IntegrityError:
+            # 같은 유저의 요청이 동시에 들어와서 이미 참여 처리된 경우 (인원 수 증가도 롤백됨)
+            pass
+        return self.get_response(post)
+
+    def delete(self, request, uuid):
+        post = get_object_or_404(Post, uuid=uuid)
+        if post.writer_id == request.user.pk:
+            raise PostWriterCannotLeaveError()
+
+        now = timezone.now()
+        with transaction.atomic():
+            removed, _ = Post.participants.through.objects.filter(
+                post_id=post.pk, user_id=request.user.pk
+            ).delete()
+            if removed:
+                Post.objects.filter(pk=post.pk, num_participants__gt=0).update(
+                    num_participants=F("num_participants") - 1, updated_at=now
+                )
+                get_user_model().objects.filter(pk=request.user.pk).update(
+                    updated_at=now
+                )
+        return self.get_response(post)
+
+    def get_response(self, post):
+        post.refresh_from_db(fields=["num_participants", "max_participants"])
+        serializer = PostParticipationSerializer(
+            {
+                "uuid": post.uuid,
+                "num_participants": post.num_participants,
+                "max_participants": post.max_participants,
+                "is_participating": post.participants.filter(
+                    pk=self.request.user.pk
+                ).exists(),
+            }
+        )
+        return Response(serializer.data)
+
+
+@extend_schema_view(**specs.post_favorite_api_specs)
+class PostFavoriteAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, uuid):
+        post = get_object_or_404(Post, uuid=uuid)
+        # favorite_count 는 m2m_changed 에서 다시 계산함
+        request.user.favorite_posts.add(post)
+        return self.get_response(post, is_favorited=True)
+
+    def delete(self, request, uuid):
+        post = get_object_or_404(Post, uuid=uuid)
+        request.user.favorite_posts.remove(post)
+        return self.get_response(post, is_favorited=False)
+
+    def get_response(self, post, is_favorited):
+        post.refresh_from_db(fields=["favorite_count"])
+        serializer = PostFavoriteSerializer(
+            {
+                "uuid": post.uuid,
+                "favorite_count": post.favorite_count,
+                "is_favorited": is_favorited,
+            }
+        )
+        return Response(serializer.data)
+
+
+class PostUploadMixin:
+    permission_classes = [IsAuthenticated]
+
+    def get_post(self, uuid):
+        post = get_object_or_404(Post, uuid=uuid)
+        if post.writer_id != self.request.user.pk:
+            raise PermissionDenied("글 작성자만 이미지를 올릴 수 있습니다.")
+        return post
+
+    def get_upload_prefix(self, post):
+        # Post.upload_to / PostImage.upload_to 와 같은 위치에 올림
+        return f"posts/{post.uuid}"
+
+
+@extend_schema_view(**specs.post_uploads_api_specs)
+class PostUploadsAPIView(PostUploadMixin, APIView):
+    def post(self, request, uuid):
+        post = self.get_post(uuid)
+        serializer = UploadRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uploads = create_uploads(
+            self.get_upload_prefix(post),
+            serializer.validated_data["content_types"],
+            request=request,
+        )
+        return Response(UploadSerializer(uploads, many=True).data)
+
+
+@extend_schema_view(**specs.post_upload_confirm_api_specs)
+class PostUploadConfirmAPIView(PostUploadMixin, APIView):
+    def post(self, request, uuid):
+        post = self.get_post(uuid)
+        serializer = PostUploadConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        image = serializer.validated_data.get("image")
+        images = serializer.validated_data.get("images", [])
+
+        keys = [image, *images] if image else images
+        validate_uploaded_keys(keys, self.get_upload_prefix(post))
+        # 이미 연결된 파일을 다시 연결하면 한 쪽을 지울 때 다른 쪽의 파일도 지워짐
+        if len(set(keys)) != len(keys) or (
+            post.image.name in keys or PostImage.objects.filter(image__in=keys).exists()
+        ):
+            raise ValidationError({"key": "이미 연결된 파일입니다."})
+
+        with transaction.atomic():
+            update_fields = ["updated_at"]
+            if image:
+                release_images_on_commit([(post.image.name, post.image_variants)])
+                post.image = image
+                post.image_variants = {}
+                update_fields += ["image", "image_variants"]
+            post.save(update_fields=update_fields)
+            PostImage.objects.bulk_create(
+                [PostImage(post=post, image=name) for name in images]
+            )
+            image_pipeline.enqueue(post.pk)
+
+        post = Post.objects.with_related().with_favorited(request.user).get(pk=post.pk)
+        return Response(PostSerializer(post, context={"request": request}).data)
+
+
+@extend_schema_view(**specs.post_comments_api_specs)
+class PostCommentThreadAPIView(ListAPIView):
+    """
+    글을 찾은 뒤, 댓글 한 페이지와 그 댓글들의 대댓글을 두 번의 쿼리로 불러옵니다.
+    대댓글은 댓글마다 (created_at, id) 순으로 앞에서부터 sub_comments_limit + 1 개만 가져와서
+    더 있는지 확인하고, 나머지는 대댓글 목록 API 의 커서로 이어서 불러오게 합니다.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ThreadedCommentSerializer
+    pagination_class = KeysetPagination
+    cursor_ordering = ("created_at", "id")
+
+    def get_queryset(self):
+        limit = self.get_sub_comments_limit()
+        first_sub_comments = (
+            SubComment.objects.filter(comment_id=OuterRef("comment_id"))
+            .order_by(*self.cursor_ordering)
+            .values("id")[: limit + 1]
+        )
+        sub_comments = (
+            SubComment.objects.filter(id__in=Subquery(first_sub_comments))
+            .select_related("writer")
+            .order_by(*self.cursor_ordering)
+        )
+        # 다른 /posts/<uuid>/... API 와 같이 없는 글이면 404 를 반환함 (댓글은 JOIN 없이 찾음)
+        self.post = get_object_or_404(
+            Post.objects.only("id", "uuid"), uuid=self.kwargs["uuid"]
+        )
+        return (
+            Comment.objects.filter(post_id=self.post.pk)
+            .select_related("writer")
+            .prefetch_related(
+                Prefetch(
+                    "sub_comments",
+                    queryset=sub_comments,
+                    to_attr="prefetched_sub_comments",
+                )
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        comments = self.paginate_queryset(self.get_queryset())
+        limit = self.get_sub_comments_limit()
+        for comment in comments:
+            comment.post = self.post
+            comment.sub_comments_page = comment.prefetched_sub_comments[:limit]
+            comment.more_sub_comments = None
+            if len(comment.prefetched_sub_comments) > limit:
+                comment.more_sub_comments = self.get_more_sub_comments_link(
+                    comment, comment.sub_comments_page[-1], limit
+                )
+        serializer = self.get_serializer(comments, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_sub_comments_limit(self):
+        try:
+            return _positive_int(
+                self.request.query_params["sub_comments_limit"],
+                strict=True,
+                cutoff=MAX_SUB_COMMENTS_LIMIT,
+            )
+        except (KeyError, ValueError):
+            return DEFAULT_SUB_COMMENTS_LIMIT
+
+    def get_more_sub_comments_link(self, comment, last_sub_comment, limit):
+        url = self.request.build_absolute_uri(
+            reverse("nanuri.posts.api:sub-comment-list")
+        )
+        url = replace_query_param(url, "comment", comment.uuid)
+        url = replace_query_param(url, "limit", limit)
+        cursor = encode_cursor(
+            [getattr(last_sub_comment, field) for field in self.cursor_ordering]
+        )
+        return replace_query_param(url, "cursor", cursor)
+
+
+class CommentOrderingMixin:
+    """
+    ?ordering=oldest|newest (기본값 oldest) 로 (created_at, id) 순서를 정합니다.
+    LimitOffset 과 keyset 페이지네이션 모두 같은 순서를 사용하고,
+    부모로 필터링하면 (부모, created_at, id) 인덱스를 따라 읽습니다.
+    """
+
+    def get_cursor_ordering(self):
+        ordering = self.request.query_params.get("ordering", "oldest")
+        if ordering not in COMMENT_ORDERINGS:
+            raise ValidationError(
+                {"ordering": f"Must be one of: {', '.join(COMMENT_ORDERINGS)}."}
+            )
+        return COMMENT_ORDERINGS[ordering]
+
+    def get_parent_id(self, model, param):
+        # 부모의 uuid 를 한 번만 id 로 바꿔서 목록 쿼리에서 JOIN 하지 않도록 함
+        uuid = self.request.query_params[param]
+        try:
+            return model.objects.filter(uuid=uuid).values_list("id", flat=True).first()
+        except DjangoValidationError:
+            raise ValidationError({param: "Must be a valid UUID."})
 
 
 @extend_schema_view(**specs.comments_api_specs)
-class CommentListCreateAPIView(ListCreateAPIView):
+class CommentListCreateAPIView(
+    CommentOrderingMixin, ConditionalListMixin, ListCreateAPIView
+):
     permission_classes = [IsAuthenticated]
+    pagination_class = CursorOrLimitOffsetPagination
     serializer_class = CommentSerializer
 
     def get_queryset(self):
-        queryset = Comment.objects.all()
-        if post := self.request.query_params.get("post", default=None):
-            queryset = queryset.filter(post__uuid=post)
-        return queryset
+        queryset = Comment.objects.select_related("post", "writer")
+        if self.request.query_params.get("post"):
+            queryset = queryset.filter(post_id=self.get_parent_id(Post, "post"))
+        return queryset.order_by(*self.get_cursor_ordering())
 
     def perform_create(self, serializer):
         post_uuid = self.request.data["post"]
@@ -93,26 +812,31 @@ class CommentListCreateAPIView(ListCreateAPIView):
 
 
 @extend_schema_view(**specs.comment_api_specs)
-class CommentRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+class CommentRetrieveUpdateDestroyAPIView(
+    ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView
+):
     permission_classes = [IsAuthenticated]
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     lookup_field = "uuid"
 
-    def get_object(self):
-        uuid = self.kwargs[self.lookup_field]
-        return Comment.objects.get(uuid=uuid)
-
 
 @extend_schema_view(**specs.sub_comments_api_specs)
-class SubCommentListCreateAPIView(ListCreateAPIView):
+class SubCommentListCreateAPIView(
+    CommentOrderingMixin, ConditionalListMixin, ListCreateAPIView
+):
     permission_classes = [IsAuthenticated]
+    pagination_class = CursorOrLimitOffsetPagination
     serializer_class = SubCommentSerializer
 
     def get_queryset(self):
-        queryset = SubComment.objects.all()
-        if comment := self.request.query_params.get("comment", default=None):
-            queryset = queryset.filter(comment__uuid=comment)
-        return queryset
+        queryset = SubComment.objects.select_related("comment", "writer")
+        if self.request.query_params.get("comment"):
+            queryset = queryset.filter(
+                comment_id=self.get_parent_id(Comment, "comment")
+            )
+        # 기본값 oldest 는 /posts/<uuid>/comments/ 의 more_sub_comments 커서와 같은 순서임
+        return queryset.order_by(*self.get_cursor_ordering())
 
     def perform_create(self, serializer):
         comment_uuid = self.request.data["comment"]
@@ -122,11 +846,10 @@ class SubCommentListCreateAPIView(ListCreateAPIView):
 
 
 @extend_schema_view(**specs.sub_comment_api_specs)
-class SubCommentRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+class SubCommentRetrieveUpdateDestroyAPIView(
+    ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView
+):
     permission_classes = [IsAuthenticated]
+    queryset = SubComment.objects.all()
     serializer_class = SubCommentSerializer
     lookup_field = "uuid"
-
-    def get_object(self):
-        uuid = self.kwargs[self.lookup_field]
-        return SubComment.objects.get(uuid=uuid)
@@ -0,0 +1,111 @@
+import math
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+
+from . import geohash
+
+EARTH_RADIUS_IN_METER = 6371008.8
+METERS_PER_DEGREE = 2 * math.pi * EARTH_RADIUS_IN_METER / 360
+
+
+def haversine(longitude1, latitude1, longitude2, latitude2):
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(longitude2 - longitude1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_IN_METER * math.asin(math.sqrt(a))
+
+
+class NearbyFeedCache:
+    """
+    요청 위치를 geohash 셀(cell_precision)로 양자화해서 셀 단위로 반경 내 후보 글 목록을 캐시하고,
+    실제 요청 위치와의 거리는 메모리에서 다시 계산합니다.
+
+    무효화는 더 큰 geohash 셀(index_precision) 단위의 버전 키로 처리합니다.
+    캐시 키에는 주변 9개 인덱스 셀의 버전이 포함되기 때문에, 글이 생성/수정/삭제되면
+    그 글이 속한 인덱스 셀의 버전만 올려도 해당 글을 포함할 수 있는 모든 캐시가 무효화됩니다.
+    """
+
+    cell_precision = 6
+    index_precision = 4
+    key_prefix = "posts:nearby"
+
+    def get_nearby(self, queryset, point, distance, categories=()):
+        """반경 내 글을 가까운 순서대로 [(post_id, distance_in_meter), ...] 로 반환합니다."""
+        cell = geohash.encode(point.y, point.x, self.cell_precision)
+        key = self.make_key(cell, distance, categories)
+        candidates = cache.get(key)
+        if candidates is None:
+            candidates = self.find_candidates(queryset, cell, distance, categories)
+            cache.set(key, candidates, settings.POSTS_NEARBY_FEED_CACHE_TIMEOUT)
+
+        nearby = []
+        for post_id, longitude, latitude in candidates:
+            meters = haversine(point.x, point.y, longitude, latitude)
+            if meters <= distance:
+                nearby.append((post_id, meters))
+        nearby.sort(key=lambda x: (x[1], x[0]))
+        return nearby
+
+    def find_candidates(self, queryset, cell, distance, categories):
+        latitude, longitude = geohash.center(cell)
+        search_distance = distance + self.get_cell_radius(cell)
+        queryset = queryset.within(
+            Point(longitude, latitude, srid=4326), search_distance
+        )
+        if categories:
+            queryset = queryset.filter(category__in=categories)
+        return [
+            (post_id, location.x, location.y)
+            for post_id, location in queryset.values_list("id", "location")
+        ]
+
+    def is_cacheable(self, point, distance):
+        # 반경이 인덱스 셀보다 작아야 주변 9개 셀 안에 모든 후보가 들어옴
+        index_cell = geohash.encode(point.y, point.x, self.index_precision)
+        min_latitude, min_longitude, max_latitude, max_longitude = geohash.bounds(
+            index_cell
+        )
+        height = (max_latitude - min_latitude) * METERS_PER_DEGREE
+        width = (
+            (max_longitude - min_longitude)
+            * METERS_PER_DEGREE
+            * math.cos(math.radians(max(abs(min_latitude), abs(max_latitude))))
+        )
+        cell = geohash.encode(point.y, point.x, self.cell_precision)
+        return distance + 2 * self.get_cell_radius(cell) < min(height, width)
+
+    def invalidate(self, *points):
+        for point in points:
+            if point is None:
+                continue
+            index_cell = geohash.encode(point.y, point.x, self.index_precision)
+            version_key = self.make_version_key(index_cell)
+            cache.add(version_key, 0, None)
+            try:
+                cache.incr(version_key)
+            except ValueError:
+                cache.set(version_key, 1, None)
+
+    def get_cell_radius(self, cell):
+        min_latitude, min_longitude, max_latitude, max_longitude = geohash.bounds(cell)
+        return haversine(min_longitude, min_latitude, max_longitude, max_latitude) / 2
+
+    def make_version_key(self, index_cell):
+        return f"{self.key_prefix}:version:{index_cell}"
+
+    def make_key(self, cell, distance, categories):
+        index_cells = geohash.neighbors(cell[: self.index_precision])
+        version_keys = [self.make_version_key(index_cell) for index_cell in index_cells]
+        versions = cache.get_many(version_keys)
+        version = ".".join(str(versions.get(key, 0)) for key in version_keys)
+        category = ",".join(sorted(categories)) or "*"
+        return f"{self.key_prefix}:{cell}:{distance}:{category}:{version}"
+
+
+nearby_feed_cache = NearbyFeedCache()
@@ -0,0 +1,100 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountBuffer:
+    """
+    조회수 증가분을 프로세스 메모리에 모아뒀다가 주기적으로 한 번에 반영합니다.
+    증가분이 같은 글끼리 묶어서 `UPDATE ... SET view_count = view_count + n` 으로 처리합니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.flush_thread = None
+
+    @property
+    def pending_increments(self):
+        with self.lock:
+            return sum(self.pending.values())
+
+    def add(self, post_id, count=1):
+        with self.lock:
+            self.pending[post_id] += count
+            self.start_flush_thread()
+
+    def get_pending(self, post_id):
+        with self.lock:
+            return self.pending.get(post_id, 0)
+
+    def clear(self):
+        with self.lock:
+            self.pending.clear()
+
+    def flush(self):
+        from .models import Post
+
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+        if not pending:
+            return 0
+
+        post_ids_by_count = defaultdict(list)
+        for post_id, count in pending.items():
+            post_ids_by_count[count].append(post_id)
+
+        flushed = 0
+        for count, post_ids in post_ids_by_count.items():
+            try:
+                Post.objects.filter(pk__in=post_ids).update(
+                    view_count=F("view_count") + count
+                )
+            except DatabaseError:
+                logger.exception("Failed to flush view counts")
+                # 반영하지 못한 증가분은 다음 flush 때 다시 시도함
+                with self.lock:
+                    self.pending.update({post_id: count for post_id in post_ids})
+            else:
+                flushed += count * len(post_ids)
+
+        logger.info(
+            "Flushed %d view count increments (%d pending)",
+            flushed,
+            self.pending_increments,
+        )
+        return flushed
+
+    def start_flush_thread(self):
+        interval = settings.POSTS_VIEW_COUNT_FLUSH_INTERVAL
+        if interval is None or self.flush_thread is not None:
+            return
+        self.flush_thread = threading.Thread(
+            target=self.run_flush_loop,
+            args=(interval,),
+            name="view-count-flush",
+            daemon=True,
+        )
+        self.flush_thread.start()
+
+    def run_flush_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Unexpected error while flushing view counts")
+            finally:
+                close_old_connections()
+
+
+view_count_buffer = ViewCountBuffer()
+atexit.register(view_count_buffer.flush)
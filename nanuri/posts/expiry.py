@@ -0,0 +1,54 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Post
+from .signals import invalidate_nearby_feed, post_expired
+
+
+def expire_posts(batch_size=500, today=None):
+    """
+    모집 기간(waited_until)이 지난 모집 중인 글을 batch_size 개씩 마감하고 마감한 글 수를 반환합니다.
+    최소 인원을 채우지 못한 글은 CANCELLED, 채운 글은 ORDERING 이 되며,
+    배치마다 커밋 후 post_expired 시그널을 보냅니다.
+    """
+    today = today or timezone.localdate()
+    total = 0
+    while posts := expire_batch(batch_size, today):
+        total += len(posts)
+    return total
+
+
+def expire_batch(batch_size, today):
+    with transaction.atomic():
+        queryset = (
+            Post.objects.expired(today)
+            .order_by("waited_until", "id")
+            .only(
+                "id",
+                "uuid",
+                "title",
+                "location",
+                "min_participants",
+                "num_participants",
+            )
+        )
+        # 여러 곳에서 동시에 실행되어도 같은 글을 두 번 마감하지 않도록 하고,
+        # 참여 요청과 겹치면 참여가 끝난 뒤의 인원 수로 상태를 정함
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        posts = list(queryset[:batch_size])
+        if not posts:
+            return []
+
+        now = timezone.now()
+        for post in posts:
+            if post.num_participants < post.min_participants:
+                post.order_status = Post.OrderStatus.CANCELLED
+            else:
+                post.order_status = Post.OrderStatus.ORDERING
+            post.updated_at = now
+        Post.objects.bulk_update(posts, ["order_status", "updated_at"])
+
+        invalidate_nearby_feed(*[post.location for post in posts])
+        transaction.on_commit(lambda: post_expired.send(sender=Post, posts=posts))
+    return posts
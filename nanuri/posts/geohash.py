@@ -0,0 +1,66 @@
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(latitude, longitude, precision):
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    is_longitude = True
+    while len(geohash) < precision:
+        value, value_range = (
+            (longitude, longitude_range) if is_longitude else (latitude, latitude_range)
+        )
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            value_range[0] = middle
+        else:
+            bits = bits << 1
+            value_range[1] = middle
+        is_longitude = not is_longitude
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(geohash)
+
+
+def bounds(geohash):
+    """셀의 경계를 (최소 위도, 최소 경도, 최대 위도, 최대 경도)로 반환합니다."""
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    is_longitude = True
+    for char in geohash:
+        bits = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = longitude_range if is_longitude else latitude_range
+            middle = (value_range[0] + value_range[1]) / 2
+            if (bits >> shift) & 1:
+                value_range[0] = middle
+            else:
+                value_range[1] = middle
+            is_longitude = not is_longitude
+    return latitude_range[0], longitude_range[0], latitude_range[1], longitude_range[1]
+
+
+def center(geohash):
+    min_latitude, min_longitude, max_latitude, max_longitude = bounds(geohash)
+    return (min_latitude + max_latitude) / 2, (min_longitude + max_longitude) / 2
+
+
+def neighbors(geohash):
+    """geohash 셀 자신과 주변 8개 셀을 반환합니다."""
+    min_latitude, min_longitude, max_latitude, max_longitude = bounds(geohash)
+    latitude, longitude = center(geohash)
+    height = max_latitude - min_latitude
+    width = max_longitude - min_longitude
+    cells = set()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            neighbor_latitude = min(max(latitude + dy * height, -89.999999), 89.999999)
+            neighbor_longitude = (longitude + dx * width + 180) % 360 - 180
+            cells.add(encode(neighbor_latitude, neighbor_longitude, len(geohash)))
+    return sorted(cells)
@@ -0,0 +1,203 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# 변형 이름: 긴 변의 최대 길이 (px)
+VARIANT_SIZES = {
+    "large": 1280,
+    "medium": 640,
+    "thumbnail": 200,
+}
+
+# 확장자: (Pillow 포맷, 저장 옵션)
+VARIANT_FORMATS = {
+    "jpg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+}
+
+
+# 이미지로 열 수 없는 파일의 변형 표시 {"failed": {}}
+# (process_post_images 명령이 같은 파일을 계속 다시 처리하지 않도록 함)
+FAILED_VARIANT = "failed"
+
+
+class InvalidImageError(Exception):
+    pass
+
+
+def get_variant_name(name, variant, ext):
+    path = PurePosixPath(name)
+    return str(path.with_name(f"{path.stem}_{variant}.{ext}"))
+
+
+def get_variant_names(name):
+    return [
+        get_variant_name(name, variant, ext)
+        for variant in VARIANT_SIZES
+        for ext in VARIANT_FORMATS
+    ]
+
+
+def get_stored_names(name, variants):
+    """원본과 변형 이미지의 저장소 이름 목록을 반환합니다."""
+    names = [name] if name else []
+    for variant_names in variants.values():
+        names.extend(variant_names.values())
+    return names
+
+
+def get_variant_urls(variants):
+    return {
+        variant: {ext: default_storage.url(name) for ext, name in names.items()}
+        for variant, names in variants.items()
+        if variant != FAILED_VARIANT
+    }
+
+
+def create_variants(name):
+    """
+    저장소의 원본 이미지로 크기별 JPEG/WebP 변형을 만들어 저장하고
+    {"thumbnail": {"jpg": "<name>", "webp": "<name>"}, ...} 를 반환합니다.
+    """
+    # 저장소 오류는 그대로 전달하고, 파일을 이미지로 읽지 못한 경우만 InvalidImageError 로 구분함
+    with default_storage.open(name, "rb") as f:
+        data = f.read()
+    try:
+        image = Image.open(BytesIO(data))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(name) from e
+
+    variants = {}
+    for variant, size in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+        variants[variant] = {}
+        for ext, (image_format, options) in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, format=image_format, **options)
+            variant_name = get_variant_name(name, variant, ext)
+            # 같은 이름이 있으면 저장소가 다른 이름을 붙이므로 먼저 지움
+            default_storage.delete(variant_name)
+            variants[variant][ext] = default_storage.save(
+                variant_name, ContentFile(buffer.getvalue())
+            )
+    return variants
+
+
+def process_post_images(post_id):
+    """글 대표 이미지와 첨부 이미지 중 아직 변형이 없는 이미지의 변형을 만듭니다."""
+    from .models import Post, PostImage
+
+    post = Post.objects.filter(pk=post_id).only("id", "image", "image_variants").first()
+    if post is None:
+        return
+
+    # 변형 URL 도 글 응답에 포함되므로 updated_at 을 갱신해서 ETag 와 변경 목록(/posts/changes/)에 반영함
+    if post.image and not post.image_variants:
+        if variants := get_or_create_variants(post.image.name):
+            Post.objects.filter(pk=post.pk, image=post.image.name).update(
+                image_variants=variants, updated_at=timezone.now()
+            )
+
+    updated = False
+    for post_image in PostImage.objects.filter(post_id=post_id):
+        if not post_image.image or post_image.variants:
+            continue
+        if variants := get_or_create_variants(post_image.image.name):
+            PostImage.objects.filter(pk=post_image.pk).update(variants=variants)
+            updated = True
+    if updated:
+        Post.objects.filter(pk=post_id).update(updated_at=timezone.now())
+
+
+def get_or_create_variants(name):
+    """내용 주소로 저장된 이미지는 다른 글에서 이미 만든 변형을 그대로 사용합니다."""
+    from .models import Post, PostImage
+
+    for model, field_name in ((Post, "image_variants"), (PostImage, "variants")):
+        variants = (
+            model.objects.filter(image=name)
+            .exclude(**{field_name: {}})
+            .values_list(field_name, flat=True)
+            .first()
+        )
+        if variants:
+            return variants
+    return try_create_variants(name)
+
+
+def try_create_variants(name):
+    try:
+        return create_variants(name)
+    except InvalidImageError:
+        logger.warning("Cannot read %s as an image, skipping its variants", name)
+        return {FAILED_VARIANT: {}}
+    except Exception:
+        # 저장소 오류인 경우 원본만 사용하고, 다음에 process_post_images 명령으로 다시 처리함
+        logger.exception("Failed to create image variants for %s", name)
+        return None
+
+
+class ImagePipeline:
+    """
+    요청이 끝난 뒤(커밋 후) 크기가 제한된 스레드 풀에서 이미지 변형을 만듭니다.
+    대기 중인 작업이 `POSTS_IMAGE_MAX_PENDING` 을 넘으면 작업을 버리고,
+    버려진 이미지는 `manage.py process_post_images` 로 다시 처리할 수 있습니다.
+    `POSTS_IMAGE_WORKERS` 가 None 이면 스레드 없이 바로 처리합니다. (테스트용)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pending = None
+
+    def enqueue(self, post_id):
+        transaction.on_commit(lambda: self.submit(post_id))
+
+    def submit(self, post_id):
+        if settings.POSTS_IMAGE_WORKERS is None:
+            process_post_images(post_id)
+            return
+
+        executor, pending = self.get_executor()
+        if not pending.acquire(blocking=False):
+            logger.warning("Image pipeline is full, skipping post %s", post_id)
+            return
+        executor.submit(self.run, post_id, pending)
+
+    def run(self, post_id, pending):
+        try:
+            process_post_images(post_id)
+        except Exception:
+            logger.exception("Unexpected error while processing post %s", post_id)
+        finally:
+            pending.release()
+            close_old_connections()
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.POSTS_IMAGE_WORKERS,
+                    thread_name_prefix="post-images",
+                )
+                self.pending = threading.BoundedSemaphore(
+                    settings.POSTS_IMAGE_MAX_PENDING
+                )
+            return self.executor, self.pending
+
+
+image_pipeline = ImagePipeline()
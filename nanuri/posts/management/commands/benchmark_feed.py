@@ -0,0 +1,201 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from nanuri.pagination import KeysetPagination
+from nanuri.posts.models import Comment, Post, SubComment
+
+# 서울 주변 (경도, 위도) 범위
+LONGITUDE_RANGE = (126.76, 127.18)
+LATITUDE_RANGE = (37.43, 37.70)
+
+
+class Command(BaseCommand):
+    help = (
+        "대량의 글 데이터를 생성한 뒤 피드 쿼리 모양별로 EXPLAIN 결과와 실행 시간을 출력합니다. "
+        "--keep 옵션이 없으면 생성한 데이터는 롤백됩니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--comments", type=int, default=200000)
+        parser.add_argument("--sub-comments", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--keep", action="store_true")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["users"], options["posts"], options["batch_size"])
+            self.seed_comments(
+                options["comments"], options["sub_comments"], options["batch_size"]
+            )
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+
+            for name, queryset in self.get_query_shapes():
+                self.benchmark(name, queryset, options["repeat"])
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def seed(self, num_users, num_posts, batch_size):
+        User = get_user_model()
+        prefix = timezone.now().strftime("%Y%m%d%H%M%S")
+        User.objects.bulk_create(
+            [
+                User(
+                    email=f"benchmark-{prefix}-{index}@example.com",
+                    nickname=f"benchmark-{index}",
+                    location=self.random_point(),
+                )
+                for index in range(num_users)
+            ],
+            batch_size=batch_size,
+        )
+        users = list(User.objects.filter(email__startswith=f"benchmark-{prefix}-"))
+
+        # 최신순 정렬이 의미 있도록 created_at 을 과거 90일 사이로 분산시킴
+        created_at_field = Post._meta.get_field("created_at")
+        created_at_field.auto_now_add = False
+        now = timezone.now()
+        try:
+            for offset in range(0, num_posts, batch_size):
+                posts = []
+                for _ in range(min(batch_size, num_posts - offset)):
+                    writer = random.choice(users)
+                    posts.append(
+                        Post(
+                            title=f"benchmark post {offset}",
+                            category=random.choice(Post.Category.values),
+                            unit_price=random.randint(1000, 100000),
+                            quantity=random.randint(1, 30),
+                            description="benchmark",
+                            min_participants=random.randint(2, 5),
+                            max_participants=random.randint(6, 20),
+                            product_url="https://example.com",
+                            order_status=random.choice(Post.OrderStatus.values),
+                            is_published=random.random() < 0.9,
+                            created_at=now
+                            - timedelta(seconds=random.randint(0, 90 * 24 * 3600)),
+                            writer=writer,
+                            location=writer.location,
+                        )
+                    )
+                Post.objects.bulk_create(posts)
+                self.stdout.write(f"Seeded {offset + len(posts)}/{num_posts} posts")
+        finally:
+            created_at_field.auto_now_add = True
+
+        self.users = users
+        self.writer = random.choice(users)
+        self.point = self.random_point()
+        self.deep_offset = min(5000, num_posts // 2)
+
+    def seed_comments(self, num_comments, num_sub_comments, batch_size):
+        post_ids = list(
+            Post.objects.filter(writer__in=self.users).values_list("id", flat=True)
+        )
+        for offset in range(0, num_comments, batch_size):
+            size = min(batch_size, num_comments - offset)
+            Comment.objects.bulk_create(
+                [
+                    Comment(
+                        post_id=random.choice(post_ids),
+                        text="benchmark",
+                        writer=random.choice(self.users),
+                    )
+                    for _ in range(size)
+                ]
+            )
+            self.stdout.write(f"Seeded {offset + size}/{num_comments} comments")
+
+        comment_ids = list(
+            Comment.objects.filter(post_id__in=post_ids).values_list("id", flat=True)
+        )
+        for offset in range(0, num_sub_comments if comment_ids else 0, batch_size):
+            size = min(batch_size, num_sub_comments - offset)
+            SubComment.objects.bulk_create(
+                [
+                    SubComment(
+                        comment_id=random.choice(comment_ids),
+                        text="benchmark",
+                        writer=random.choice(self.users),
+                    )
+                    for _ in range(size)
+                ]
+            )
+            self.stdout.write(f"Seeded {offset + size}/{num_sub_comments} sub-comments")
+
+        # bulk_create 는 signals 를 보내지 않으므로 비정규화한 개수를 직접 채움
+        Post.objects.filter(pk__in=post_ids).update(
+            comment_count=Post.get_comment_count()
+        )
+
+    def random_point(self):
+        return Point(
+            random.uniform(*LONGITUDE_RANGE),
+            random.uniform(*LATITUDE_RANGE),
+            srid=4326,
+        )
+
+    def get_query_shapes(self):
+        ordering = ("-created_at", "-id")
+        latest = Post.objects.order_by(*ordering)
+
+        # 깊은 페이지를 keyset 과 offset 방식으로 각각 조회함
+        deep = latest[self.deep_offset]
+        paginator = KeysetPagination()
+        paginator.ordering = ordering
+        position_filter = paginator.get_position_filter([deep.created_at, deep.id])
+
+        return [
+            ("latest", latest[:10]),
+            ("latest recruiting", latest.recruiting()[:10]),
+            # POSTS_COMMENT_COUNT_SOURCE 별 comment_count 계산 비용
+            (
+                "latest with comment_count (subquery)",
+                latest.only("id").annotate(
+                    annotated_comment_count=Post.get_comment_count()
+                )[:10],
+            ),
+            (
+                "latest with comment_count (denormalized)",
+                latest.only("id", "comment_count")[:10],
+            ),
+            ("latest by category", latest.filter(category__in=["FOOD"])[:10]),
+            ("latest by writer", latest.filter(writer__uuid=self.writer.uuid)[:10]),
+            ("deep page (offset)", latest[self.deep_offset : self.deep_offset + 10]),
+            ("deep page (keyset)", latest.filter(position_filter)[:10]),
+            (
+                "within 3km",
+                Post.objects.annotate(distance=Distance("location", self.point))
+                .within(self.point, 3000)
+                .order_by("distance", "id")[:10],
+            ),
+            ("nearest 10", Post.objects.nearest(self.point, 10)),
+        ]
+
+    def benchmark(self, name, queryset, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {name} =="))
+        self.stdout.write(queryset.explain())
+        timings = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started_at) * 1000)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"min {min(timings):.2f}ms / avg {sum(timings) / len(timings):.2f}ms "
+                f"({repeat} runs)"
+            )
+        )
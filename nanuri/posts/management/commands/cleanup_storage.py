@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from nanuri.posts.storage import storage_cleaner
+
+
+class Command(BaseCommand):
+    help = (
+        "삭제 대기열(StorageDeletion)에 남은 파일을 지웁니다. "
+        "--sweep 옵션을 주면 글과 첨부 이미지에서 참조하지 않는 파일도 찾아서 지웁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sweep", action="store_true")
+        parser.add_argument("--prefix", default="posts")
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=24,
+            help="이 시간(시간 단위)보다 오래된 파일만 참조하지 않는 파일로 봅니다.",
+        )
+
+    def handle(self, *args, **options):
+        if options["sweep"]:
+            orphaned = storage_cleaner.sweep(
+                options["prefix"], timedelta(hours=options["min_age"])
+            )
+            self.stdout.write(f"Found {len(orphaned)} orphaned files")
+
+        deleted, failed = storage_cleaner.drain()
+        self.stdout.write(f"Deleted {deleted} files ({failed} failed)")
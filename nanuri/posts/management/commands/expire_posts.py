@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from nanuri.posts.expiry import expire_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "모집 기간(waited_until)이 지난 모집 중인 글을 마감합니다. "
+        "최소 인원을 채우지 못한 글은 취소되고, 채운 글은 주문 진행 중으로 바뀝니다. "
+        "cron 등으로 하루에 한 번 이상 실행해 주세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        expired = expire_posts(batch_size=options["batch_size"])
+        self.stdout.write(f"Expired {expired} posts")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from nanuri.posts.images import process_post_images
+from nanuri.posts.models import Post, PostImage
+
+
+class Command(BaseCommand):
+    help = "이미지 변형(썸네일 등)이 아직 만들어지지 않은 글의 이미지를 처리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--post", help="특정 글(uuid)만 처리합니다.")
+
+    def handle(self, *args, **options):
+        if options["post"]:
+            posts = Post.objects.filter(uuid=options["post"])
+        else:
+            # 이미지가 없는 글/첨부 이미지는 처리할 것이 없으므로 제외함
+            post_images = (
+                PostImage.objects.filter(variants={}, image__isnull=False)
+                .exclude(image="")
+                .values("post_id")
+            )
+            posts = Post.objects.filter(
+                Q(image_variants={}, image__isnull=False) & ~Q(image="")
+                | Q(pk__in=post_images)
+            )
+        post_ids = list(posts.values_list("id", flat=True).distinct().order_by("id"))
+        for index, post_id in enumerate(post_ids, start=1):
+            process_post_images(post_id)
+            self.stdout.write(f"Processed {index}/{len(post_ids)} posts")
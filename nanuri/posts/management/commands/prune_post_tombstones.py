@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from nanuri.posts.models import PostTombstone
+
+
+class Command(BaseCommand):
+    help = "보관 기간(POSTS_TOMBSTONE_RETENTION_DAYS)이 지난 글 삭제 기록을 지웁니다."
+
+    def handle(self, *args, **options):
+        retention = timedelta(days=settings.POSTS_TOMBSTONE_RETENTION_DAYS)
+        deleted, _ = PostTombstone.objects.filter(
+            deleted_at__lt=timezone.now() - retention
+        ).delete()
+        self.stdout.write(f"Deleted {deleted} tombstones")
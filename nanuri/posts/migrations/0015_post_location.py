@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:06
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def copy_writer_location(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    User = apps.get_model('users', 'User')
+    writer_location = User.objects.filter(pk=OuterRef('writer_id')).values('location')[:1]
+    Post.objects.filter(location__isnull=True).update(location=Subquery(writer_location))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_remove_user_address'),
+        ('posts', '0014_auto_20220811_1233'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='location',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, geography=True, null=True, srid=4326),
+        ),
+        migrations.RunPython(copy_writer_location, migrations.RunPython.noop),
+    ]
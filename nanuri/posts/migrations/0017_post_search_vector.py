@@ -0,0 +1,60 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:13
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_VECTOR_INDEX = django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='post_search_vector_idx')
+
+
+def add_search_vector_index(apps, schema_editor):
+    # GIN 인덱스와 tsvector 는 PostgreSQL 에서만 사용함 (테스트용 SpatiaLite 에서는 건너뜀)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Post = apps.get_model('posts', 'Post')
+    schema_editor.add_index(Post, SEARCH_VECTOR_INDEX)
+
+
+def remove_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Post = apps.get_model('posts', 'Post')
+    schema_editor.remove_index(Post, SEARCH_VECTOR_INDEX)
+
+
+def update_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(
+        search_vector=SearchVector('title', weight='A', config='simple')
+        + SearchVector('description', weight='B', config='simple')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(update_search_vector, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='post',
+                    index=SEARCH_VECTOR_INDEX,
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_vector_index, remove_search_vector_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from nanuri.posts.search import tokenize
+
+
+def create_title_tokens(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostTitleToken = apps.get_model('posts', 'PostTitleToken')
+    title_tokens = []
+    for post_id, title in Post.objects.values_list('id', 'title').iterator():
+        title_tokens += [PostTitleToken(token=token, post_id=post_id) for token in tokenize(title)]
+        if len(title_tokens) >= 5000:
+            PostTitleToken.objects.bulk_create(title_tokens)
+            title_tokens = []
+    PostTitleToken.objects.bulk_create(title_tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTitleToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=3)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='title_tokens', to='posts.post')),
+            ],
+            options={
+                'unique_together': {('token', 'post')},
+            },
+        ),
+        migrations.RunPython(create_title_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:40
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_participants(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    participants = (
+        Post.participants.through.objects.filter(post_id=OuterRef('pk'))
+        .order_by()
+        .values('post_id')
+        .annotate(count=Count('user_id'))
+        .values('count')
+    )
+    Post.objects.update(num_participants=Coalesce(Subquery(participants), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_posttitletoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_participants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_favorites(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    User = apps.get_model('users', 'User')
+    favorites = (
+        User.favorite_posts.through.objects.filter(post_id=OuterRef('pk'))
+        .order_by()
+        .values('post_id')
+        .annotate(count=Count('user_id'))
+        .values('count')
+    )
+    Post.objects.update(favorite_count=Coalesce(Subquery(favorites), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_remove_user_address'),
+        ('posts', '0019_backfill_num_participants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_favorites, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postimage',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
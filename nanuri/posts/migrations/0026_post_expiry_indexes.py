@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0025_posttombstone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('order_status', 'WAITING')), fields=['-created_at', '-id'], name='post_waiting_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['order_status', 'waited_until'], name='post_status_waited_until_idx'),
+        ),
+    ]
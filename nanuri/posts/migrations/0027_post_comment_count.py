@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    SubComment = apps.get_model('posts', 'SubComment')
+    comments = (
+        Comment.objects.filter(post_id=OuterRef('pk'))
+        .order_by()
+        .values('post_id')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    sub_comments = (
+        SubComment.objects.filter(comment__post_id=OuterRef('pk'))
+        .order_by()
+        .values('comment__post_id')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Post.objects.update(
+        comment_count=Coalesce(Subquery(comments), 0)
+        + Coalesce(Subquery(sub_comments), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0026_post_expiry_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
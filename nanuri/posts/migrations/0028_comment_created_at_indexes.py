@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0027_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subcomment',
+            index=models.Index(fields=['comment', 'created_at', 'id'], name='sub_comment_created_at_idx'),
+        ),
+    ]
@@ -2,9 +2,155 @@ from pathlib import Path
 from uuid import uuid4
 
 from django.conf import settings
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.contrib.gis.db import models
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.measure import D
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import connections
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Func,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from . import search
+
+
+class KNNDistance(Func):
+    # PostGIS 의 `<->` 연산자로 ORDER BY 하면 공간 인덱스를 사용해서 가까운 순으로 탐색함
+    arg_joiner = " <-> "
+    template = "%(expressions)s"
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        point = Value(point, output_field=models.PointField(geography=True))
+        super().__init__(expression, point, **extra)
+
+
+class PostQuerySet(models.QuerySet):
+    def with_related(self, expand_writer=False):
+        # PostSerializer가 사용하는 관계를 미리 불러와서 N+1 쿼리를 방지함
+        User = get_user_model()
+        queryset = self.select_related("writer").prefetch_related(
+            Prefetch("participants", queryset=User.objects.only("id", "email")),
+            Prefetch("images", queryset=PostImage.objects.order_by("id")),
+        )
+        queryset = queryset.with_comment_count()
+        if expand_writer:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "writer__posts",
+                    queryset=Post.objects.only("id", "uuid", "writer_id"),
+                ),
+                Prefetch(
+                    "writer__favorite_posts",
+                    queryset=Post.objects.only("id", "uuid"),
+                ),
+                Prefetch(
+                    "writer__posts_participated",
+                    queryset=Post.objects.only("id", "uuid"),
+                ),
+            )
+        return queryset
+
+    def with_favorited(self, user):
+        # 요청한 유저의 즐겨찾기 여부를 같은 쿼리 안에서 EXISTS 로 계산함
+        favorites = get_user_model().favorite_posts.through.objects.filter(
+            post_id=OuterRef("pk"), user_id=user.pk
+        )
+        return self.annotate(is_favorited=Exists(favorites))
+
+    def with_comment_count(self):
+        # "subquery" 이면 페이지의 글마다 상관 서브쿼리로 세고,
+        # "denormalized" 이면 signals 에서 갱신하는 comment_count 컬럼을 그대로 사용함
+        if settings.POSTS_COMMENT_COUNT_SOURCE != "subquery":
+            return self
+        return self.annotate(annotated_comment_count=Post.get_comment_count())
+
+    def recruiting(self):
+        """기본 피드에 보여주는 모집 중인 글"""
+        return self.filter(order_status=Post.OrderStatus.WAITING)
+
+    def expired(self, today):
+        """모집 기간(waited_until)이 지났는데 아직 모집 중인 글"""
+        return self.recruiting().filter(waited_until__lt=today)
+
+    def within(self, point, distance):
+        # PostGIS 에서는 geography 공간 인덱스를 사용하는 ST_DWithin 으로 검색함
+        if connections[self.db].ops.postgis:
+            return self.filter(location__dwithin=(point, D(m=distance)))
+        return self.filter(location__distance_lte=(point, D(m=distance)))
+
+    def nearest(self, point, count):
+        queryset = self.filter(is_published=True, location__isnull=False)
+        if connections[self.db].ops.postgis:
+            return queryset.order_by(KNNDistance("location", point), "id")[:count]
+        return queryset.order_by(Distance("location", point), "id")[:count]
+
+    def search(self, query):
+        # PostgreSQL 에서는 GIN 인덱스가 걸린 search_vector 로 검색하고 관련도(rank)를 계산함
+        if connections[self.db].vendor == "postgresql":
+            search_query = SearchQuery(query, config="simple", search_type="websearch")
+            # ts_rank 는 real 을 반환하므로, 커서에 저장한 값과 정확히 비교할 수 있도록 double 로 변환함
+            return self.filter(search_vector=search_query).annotate(
+                rank=Cast(SearchRank(F("search_vector"), search_query), FloatField())
+            )
+
+        # 그 외 DB (테스트용 SpatiaLite) 에서는 LIKE 로 모든 단어가 포함된 글을 찾고,
+        # 제목에 포함된 단어에 더 높은 가중치를 줌
+        queryset = self
+        rank = Value(0.0)
+        for term in query.split():
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(description__icontains=term)
+            )
+            rank += Case(
+                When(title__icontains=term, then=Value(1.0)),
+                When(description__icontains=term, then=Value(0.4)),
+                default=Value(0.0),
+            )
+        return queryset.annotate(
+            rank=ExpressionWrapper(rank, output_field=FloatField())
+        )
+
+    def search_title(self, query):
+        # 제목 n-gram 색인(PostTitleToken)에서 검색어의 토큰을 모두 가진 글을 찾고,
+        # n-gram 이 순서와 상관없이 매칭될 수 있으므로 제목에 실제로 포함되는지 다시 확인함
+        words = search.normalize(query)
+        queryset = self
+        if tokens := search.tokenize_query(query):
+            post_ids = (
+                PostTitleToken.objects.filter(token__in=tokens)
+                .values("post_id")
+                .annotate(num_tokens=Count("token"))
+                .filter(num_tokens=len(tokens))
+                .values("post_id")
+            )
+            queryset = queryset.filter(pk__in=post_ids)
+        for word in words:
+            queryset = queryset.filter(title__icontains=word)
+        return queryset
+
 
 class Post(models.Model):
     class Category(models.TextChoices):
@@ -52,6 +198,8 @@ class Post(models.Model):
         default=None,
         upload_to=upload_to,
     )
+    # 대표 이미지의 크기별 변형 {"thumbnail": {"jpg": "<name>", "webp": "<name>"}, ...}
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     unit_price = models.PositiveIntegerField()
     quantity = models.PositiveIntegerField()
     description = models.TextField()
@@ -73,8 +221,16 @@ class Post(models.Model):
     is_published = models.BooleanField(default=False)
     published_at = models.DateTimeField(null=True, blank=True)
     view_count = models.PositiveBigIntegerField(default=0)
+    # favored_by 의 개수, 즐겨찾기가 바뀔 때마다 signals 에서 갱신함
+    favorite_count = models.PositiveIntegerField(default=0)
+    # 댓글과 대댓글의 개수, 댓글이 생성/삭제될 때마다 signals 에서 갱신함
+    comment_count = models.PositiveIntegerField(default=0)
     waited_from = models.DateField(null=True, blank=True, default=None)
     waited_until = models.DateField(null=True, blank=True, default=None)
+    # 글 작성 시점의 작성자 위치를 복사해서 저장함 (반경 검색용)
+    location = models.PointField(geography=True, null=True, blank=True)
+    # 제목(A) + 본문(B) 검색용 tsvector, 저장할 때마다 signals 에서 갱신함 (PostgreSQL 전용)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -94,9 +250,86 @@ class Post(models.Model):
         blank=True,
     )
 
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # 최신순 피드 (LimitOffset, keyset 페이지네이션 모두 같은 순서를 사용함)
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="post_created_at_idx",
+            ),
+            # 모집 중인 글만 보여주는 기본 피드
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=Q(order_status="WAITING"),
+                name="post_waiting_created_at_idx",
+            ),
+            # 모집 기간이 지난 글 마감 (manage.py expire_posts)
+            models.Index(
+                fields=["order_status", "waited_until"],
+                name="post_status_waited_until_idx",
+            ),
+            # ?category= 로 필터링한 최신순 피드
+            models.Index(
+                fields=["category", "-created_at", "-id"],
+                name="post_category_created_at_idx",
+            ),
+            # ?user= 로 필터링한 작성자별 최신순 피드
+            models.Index(
+                fields=["writer", "-created_at", "-id"],
+                name="post_writer_created_at_idx",
+            ),
+            # /posts/changes/?since= 변경 목록
+            models.Index(fields=["updated_at", "id"], name="post_updated_at_idx"),
+            # ?q= 전문 검색 (PostgreSQL 에서만 생성됨, 0017 마이그레이션 참고)
+            GinIndex(fields=["search_vector"], name="post_search_vector_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
+    @staticmethod
+    def get_search_vector():
+        return SearchVector("title", weight="A", config="simple") + SearchVector(
+            "description", weight="B", config="simple"
+        )
+
+    @staticmethod
+    def get_comment_count():
+        comments = (
+            Comment.objects.filter(post_id=OuterRef("pk"))
+            .order_by()
+            .values("post_id")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        sub_comments = (
+            SubComment.objects.filter(comment__post_id=OuterRef("pk"))
+            .order_by()
+            .values("comment__post_id")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return Coalesce(Subquery(comments), 0) + Coalesce(Subquery(sub_comments), 0)
+
+
+class PostTitleToken(models.Model):
+    """제목의 n-gram 토큰별로 해당 토큰을 포함하는 글을 저장하는 색인 (?q=&search_mode=ngram)"""
+
+    token = models.CharField(max_length=3)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="title_tokens",
+    )
+
+    class Meta:
+        unique_together = [["token", "post"]]
+
+    def __str__(self):
+        return f"{self.token} -> {self.post_id}"
+
 
 class PostImage(models.Model):
     def upload_to(self, filename):
@@ -121,12 +354,61 @@ class PostImage(models.Model):
         default=None,
         upload_to=upload_to,
     )
+    # 크기별 변형 (Post.image_variants 와 같은 형식)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    # 원본 파일의 SHA-256, 글을 수정할 때 같은 이미지를 다시 올리지 않도록 비교함
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
 
     @property
     def image_url(self):
         return self.image.url
 
 
+class PostTombstone(models.Model):
+    """삭제된 글의 uuid (/posts/changes/ 에서 클라이언트가 캐시에서 지울 글을 알려줌)"""
+
+    uuid = models.UUIDField(unique=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["deleted_at", "id"], name="post_tombstone_deleted_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.uuid)
+
+
+class ImageBlob(models.Model):
+    """
+    내용(SHA-256)으로 이름을 붙여 한 번만 저장한 이미지 파일과 이 파일을 참조하는 이미지 수
+    (nanuri.posts.storage.store_image / release_images 가 관리함)
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
+class StorageDeletion(models.Model):
+    """저장소에서 지워야 할 파일 목록 (nanuri.posts.storage.StorageCleaner 가 처리함)"""
+
+    name = models.CharField(max_length=255, unique=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
 class Comment(models.Model):
     uuid = models.UUIDField(
         verbose_name="uuid",
@@ -149,6 +431,15 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # 글별 댓글 목록 (?post=&ordering=oldest|newest, /posts/<uuid>/comments/)
+            models.Index(
+                fields=["post", "created_at", "id"],
+                name="comment_post_created_at_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.text[:10]}... by {self.writer}"
 
@@ -175,5 +466,14 @@ class SubComment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # 댓글별 대댓글 목록 (?comment=&ordering=oldest|newest, 댓글마다 앞의 N개)
+            models.Index(
+                fields=["comment", "created_at", "id"],
+                name="sub_comment_created_at_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.text[:10]}... by {self.writer}"
@@ -0,0 +1,34 @@
+TOKEN_SIZES = (2, 3)
+
+
+def normalize(text):
+    return text.lower().split()
+
+
+def tokenize(text):
+    """제목을 색인할 토큰 (단어별 2-gram, 3-gram) 집합을 반환합니다."""
+    tokens = set()
+    for word in normalize(text):
+        for size in TOKEN_SIZES:
+            for index in range(len(word) - size + 1):
+                tokens.add(word[index : index + size])
+    return tokens
+
+
+def tokenize_query(query):
+    """
+    검색어를 색인에서 찾을 토큰 집합으로 바꿉니다.
+    세 글자 이상인 단어는 3-gram, 두 글자인 단어는 단어 그대로 찾고,
+    한 글자인 단어는 색인으로 찾을 수 없으므로 제외합니다.
+    """
+    tokens = set()
+    size = max(TOKEN_SIZES)
+    for word in normalize(query):
+        if len(word) < min(TOKEN_SIZES):
+            continue
+        if len(word) < size:
+            tokens.add(word)
+            continue
+        for index in range(len(word) - size + 1):
+            tokens.add(word[index : index + size])
+    return tokens
@@ -0,0 +1,216 @@
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import search
+from .cache import nearby_feed_cache
+from .models import Comment, Post, PostImage, PostTitleToken, PostTombstone, SubComment
+from .storage import release_images_on_commit
+
+# 모집 기간이 지나서 마감된 글들 (posts: 바뀐 order_status 가 반영된 Post 목록)
+post_expired = Signal()
+
+
+def invalidate_nearby_feed(*points):
+    # 커밋 전에 다른 요청이 이전 데이터를 캐시했을 수 있으므로 커밋 후에 한 번 더 무효화함
+    nearby_feed_cache.invalidate(*points)
+    transaction.on_commit(lambda: nearby_feed_cache.invalidate(*points))
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_location(sender, instance, update_fields=None, **kwargs):
+    instance._previous_location = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and "location" not in update_fields:
+        return
+    instance._previous_location = (
+        Post.objects.filter(pk=instance.pk).values_list("location", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Post)
+def invalidate_nearby_feed_on_save(sender, instance, **kwargs):
+    invalidate_nearby_feed(instance.location, instance._previous_location)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_nearby_feed_on_delete(sender, instance, **kwargs):
+    invalidate_nearby_feed(instance.location)
+
+
+@receiver(post_delete, sender=Post)
+def create_tombstone(sender, instance, using, **kwargs):
+    # 작성자 탈퇴 등으로 CASCADE 삭제되는 글도 변경 목록에 남김
+    PostTombstone.objects.using(using).get_or_create(uuid=instance.uuid)
+
+
+# 작성자 탈퇴, 관리자 페이지, QuerySet.delete() 등 어떤 경로로 삭제되어도 이미지의 참조 수를 줄임
+# (삭제된 행마다 놓아주지 않고 커밋 후에 한 번에 놓아줌)
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, using, **kwargs):
+    release_images_on_commit([(instance.image.name, instance.image_variants)], using)
+
+
+@receiver(post_delete, sender=PostImage)
+def release_attached_image(sender, instance, using, **kwargs):
+    release_images_on_commit([(instance.image.name, instance.variants)], using)
+
+
+@receiver(post_save, sender=Post)
+def update_search_vector(sender, instance, using, update_fields=None, **kwargs):
+    if connections[using].vendor != "postgresql":
+        return
+    if update_fields is not None and not {"title", "description"} & set(update_fields):
+        return
+    Post.objects.using(using).filter(pk=instance.pk).update(
+        search_vector=Post.get_search_vector()
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_title_tokens(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and "title" not in update_fields:
+        return
+    # 바뀐 토큰만 추가/삭제함 (글이 삭제되면 토큰은 CASCADE 로 함께 삭제됨)
+    tokens = search.tokenize(instance.title)
+    title_tokens = PostTitleToken.objects.using(using).filter(post=instance)
+    existing_tokens = set(title_tokens.values_list("token", flat=True))
+    if removed_tokens := existing_tokens - tokens:
+        title_tokens.filter(token__in=removed_tokens).delete()
+    if added_tokens := tokens - existing_tokens:
+        PostTitleToken.objects.using(using).bulk_create(
+            [PostTitleToken(token=token, post=instance) for token in added_tokens],
+            ignore_conflicts=True,
+        )
+
+
+# 참여자/즐겨찾기 목록은 글과 유저 응답에 포함되기 때문에, 바뀌면 양쪽의 updated_at 을 갱신해서
+# ETag (nanuri.mixins.ConditionalGetMixin) 가 달라지도록 함
+@receiver(m2m_changed, sender=Post.participants.through)
+@receiver(m2m_changed, sender=get_user_model().favorite_posts.through)
+def touch_m2m_related(sender, instance, action, model, pk_set, using, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    now = timezone.now()
+    type(instance)._default_manager.using(using).filter(pk=instance.pk).update(
+        updated_at=now
+    )
+    if pk_set:
+        model._default_manager.using(using).filter(pk__in=pk_set).update(updated_at=now)
+
+
+def touch_writer(post, using):
+    # 유저 응답의 posts 목록은 글이 생성/삭제될 때만 바뀜
+    get_user_model()._default_manager.using(using).filter(pk=post.writer_id).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Post)
+def touch_writer_on_create(sender, instance, created, using, **kwargs):
+    if created:
+        touch_writer(instance, using)
+
+
+@receiver(post_delete, sender=Post)
+def touch_writer_on_delete(sender, instance, using, **kwargs):
+    touch_writer(instance, using)
+
+
+@receiver(m2m_changed, sender=get_user_model().favorite_posts.through)
+def update_favorite_count(sender, instance, action, reverse, pk_set, using, **kwargs):
+    # reverse=False: user.favorite_posts.add(post), reverse=True: post.favored_by.add(user)
+    if action == "pre_clear" and not reverse:
+        instance._cleared_favorite_post_ids = set(
+            instance.favorite_posts.values_list("pk", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        post_ids = {instance.pk}
+    elif action == "post_clear":
+        post_ids = instance._cleared_favorite_post_ids
+    else:
+        post_ids = pk_set
+    if not post_ids:
+        return
+
+    # 증감 대신 다시 세기 때문에 이미 즐겨찾기한 글을 다시 추가해도 개수가 어긋나지 않음
+    favorites = (
+        sender.objects.filter(post_id=OuterRef("pk"))
+        .order_by()
+        .values("post_id")
+        .annotate(count=Count("user_id"))
+        .values("count")
+    )
+    Post.objects.using(using).filter(pk__in=post_ids).update(
+        favorite_count=Coalesce(Subquery(favorites), 0),
+        updated_at=timezone.now(),
+    )
+
+
+def update_comment_counts(using):
+    connection = connections[using]
+    if not hasattr(connection, "pending_comment_counts"):
+        return
+    post_ids, comment_ids = connection.pending_comment_counts
+    del connection.pending_comment_counts
+    # 대댓글은 남아 있는 댓글의 글만 찾으면 됨 (함께 삭제된 댓글의 글은 댓글 삭제에서 이미 모음)
+    if comment_ids:
+        post_ids |= set(
+            Comment.objects.using(using)
+            .filter(pk__in=comment_ids)
+            .values_list("post_id", flat=True)
+        )
+    # favorite_count 와 같이 증감 대신 다시 세고, 응답이 바뀌므로 updated_at 도 갱신함
+    # 커밋 후에 실행하므로 댓글과 함께 삭제된 글은 더 이상 없어서 갱신되지 않음
+    if post_ids:
+        Post.objects.using(using).filter(pk__in=post_ids).update(
+            comment_count=Post.get_comment_count(),
+            updated_at=timezone.now(),
+        )
+
+
+def schedule_comment_count_update(using, post_ids=(), comment_ids=()):
+    """
+    댓글/대댓글이 바뀐 글을 연결마다 모아뒀다가, 커밋 후에 글마다 한 번만 댓글 수를 다시 셉니다.
+    글이나 댓글이 CASCADE 로 삭제되어도 삭제되는 행마다 UPDATE 를 실행하지 않습니다.
+    """
+    connection = connections[using]
+    if not hasattr(connection, "pending_comment_counts"):
+        connection.pending_comment_counts = (set(), set())
+    connection.pending_comment_counts[0].update(post_ids)
+    connection.pending_comment_counts[1].update(comment_ids)
+    # 롤백되면 콜백도 버려지므로 매번 등록함 (먼저 실행된 콜백이 모두 처리하고 나머지는 아무것도 안 함)
+    transaction.on_commit(lambda: update_comment_counts(using), using=using)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_comment_create(sender, instance, created, using, **kwargs):
+    if created:
+        schedule_comment_count_update(using, post_ids=[instance.post_id])
+
+
+@receiver(post_delete, sender=Comment)
+def update_comment_count_on_comment_delete(sender, instance, using, **kwargs):
+    schedule_comment_count_update(using, post_ids=[instance.post_id])
+
+
+@receiver(post_save, sender=SubComment)
+def update_comment_count_on_sub_comment_create(
+    sender, instance, created, using, **kwargs
+):
+    if created:
+        schedule_comment_count_update(using, comment_ids=[instance.comment_id])
+
+
+@receiver(post_delete, sender=SubComment)
+def update_comment_count_on_sub_comment_delete(sender, instance, using, **kwargs):
+    schedule_comment_count_update(using, comment_ids=[instance.comment_id])
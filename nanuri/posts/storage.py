@@ -0,0 +1,369 @@
+import hashlib
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import PurePosixPath
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    close_old_connections,
+    connection,
+    connections,
+    transaction,
+)
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# S3 DeleteObjects 한 번에 지울 수 있는 최대 개수
+S3_DELETE_BATCH_SIZE = 1000
+
+
+def get_content_hash(file):
+    sha256 = hashlib.sha256()
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
+
+
+def get_blob_name(content_hash, filename, unique=False):
+    ext = PurePosixPath(filename).suffix.lower()
+    suffix = f"-{uuid4().hex[:8]}" if unique else ""
+    return f"posts/blobs/{content_hash[:2]}/{content_hash}{suffix}{ext}"
+
+
+def store_image(file, content_hash=None):
+    """
+    이미지를 내용 주소(`posts/blobs/<sha256>.<ext>`)로 저장하고 저장소 이름을 반환합니다.
+    내용이 같은 파일이 이미 있으면 다시 올리지 않고 참조 수만 늘립니다.
+    저장소에 올리는 동안에는 트랜잭션을 열지 않고, 다 올린 뒤에 ImageBlob 행을 만듭니다.
+    """
+    from .models import ImageBlob, StorageDeletion
+
+    content_hash = content_hash or get_content_hash(file)
+    while True:
+        blob = ImageBlob.objects.filter(content_hash=content_hash).first()
+        if blob is not None:
+            # 참조 수가 0 이 되어 그 사이에 삭제된 행이면 처음부터 다시 시도함
+            if ImageBlob.objects.filter(pk=blob.pk).update(
+                ref_count=F("ref_count") + 1
+            ):
+                return blob.name
+            continue
+
+        # 삭제 대기 중인 파일과 같은 이름으로 올리면 곧 지워지므로 다른 이름을 사용함
+        name = get_blob_name(content_hash, file.name)
+        if StorageDeletion.objects.filter(name=name).exists():
+            name = get_blob_name(content_hash, file.name, unique=True)
+        name = default_storage.save(name, file)
+        try:
+            with transaction.atomic():
+                ImageBlob.objects.create(
+                    content_hash=content_hash, name=name, ref_count=1
+                )
+            return name
+        except IntegrityError:
+            # 같은 내용을 동시에 올린 쪽이 먼저 행을 만들었으면 그 파일을 사용함
+            if not ImageBlob.objects.filter(name=name).exists():
+                default_storage.delete(name)
+            file.seek(0)
+
+
+@contextmanager
+def storing_images():
+    """
+    `with storing_images() as store:` 블록에서 store(file, content_hash) 로 이미지를 저장합니다.
+    블록에서 예외가 발생하면 (예: 행을 만드는 트랜잭션이 실패하면) 그때까지 저장한 이미지를 놓아줍니다.
+    """
+    names = []
+
+    def store(file, content_hash=None):
+        name = store_image(file, content_hash)
+        names.append(name)
+        return name
+
+    try:
+        yield store
+    except BaseException:
+        release_images([(name, {}) for name in names])
+        raise
+
+
+def release_images(images):
+    """
+    더 이상 참조하지 않는 이미지 [(원본 이름, 변형), ...] 의 파일을 삭제 대기열에 넣습니다.
+    store_image 로 저장한 파일은 참조 수를 줄이고, 0 이 되었을 때만 지웁니다.
+    """
+    from .images import get_stored_names, get_variant_names
+    from .models import ImageBlob
+
+    images = [(name, variants) for name, variants in images if name]
+    counts = Counter(name for name, _ in images)
+    names = []
+    with transaction.atomic():
+        blobs = {
+            blob.name: blob
+            for blob in ImageBlob.objects.select_for_update().filter(name__in=counts)
+        }
+        for name, variants in images:
+            if name not in blobs:
+                names.extend(get_stored_names(name, variants))
+
+        released_blob_ids = []
+        for blob in blobs.values():
+            blob.ref_count = max(blob.ref_count - counts[blob.name], 0)
+            if blob.ref_count == 0:
+                released_blob_ids.append(blob.pk)
+                names.extend([blob.name, *get_variant_names(blob.name)])
+        ImageBlob.objects.filter(pk__in=released_blob_ids).delete()
+        ImageBlob.objects.bulk_update(
+            [blob for blob in blobs.values() if blob.ref_count], ["ref_count"]
+        )
+        storage_cleaner.enqueue(names)
+
+
+def release_images_on_commit(images, using=DEFAULT_DB_ALIAS):
+    """
+    트랜잭션 안에서 놓아준 이미지를 모아뒀다가 커밋 후에 release_images 로 한 번에 놓아줍니다.
+    행마다 삭제 신호가 오더라도 이미지 수와 상관없이 같은 수의 쿼리로 처리하고, 롤백되면 놓아주지 않습니다.
+    """
+    db = connections[using]
+    if not db.in_atomic_block:
+        release_images(images)
+        return
+
+    # 커밋/롤백되면 Django 가 on_commit 목록을 새로 만드므로, 목록이 바뀌면 새로 모음
+    # (이전에 모은 이미지는 등록해 둔 콜백이 살아 있을 때만 놓아줌)
+    pending = getattr(db, "pending_image_releases", None)
+    if pending is None or pending[0] is not db.run_on_commit:
+        pending = (db.run_on_commit, {})
+        db.pending_image_releases = pending
+    # 세이브포인트마다 따로 모아서, 세이브포인트가 롤백되면 그 안에서 놓아준 이미지만 버려지도록 함
+    batches = pending[1]
+    savepoint_ids = tuple(db.savepoint_ids)
+    if savepoint_ids not in batches:
+        batch = batches[savepoint_ids] = []
+
+        def release_batch():
+            if batches.get(savepoint_ids) is batch:
+                del batches[savepoint_ids]
+            release_images(batch)
+
+        transaction.on_commit(release_batch, using=using)
+    batches[savepoint_ids].extend(images)
+
+
+def delete_files(names, storage=default_storage):
+    """
+    여러 파일을 한 번에 지웁니다. S3 저장소에서는 DeleteObjects 로 최대 1000개씩 지우고,
+    그 외 저장소에서는 하나씩 지웁니다. 지우지 못한 파일 이름 목록을 반환합니다.
+    """
+    names = sorted({name for name in names if name})
+    if not names:
+        return []
+
+    if not hasattr(storage, "bucket"):
+        for name in names:
+            storage.delete(name)
+        return []
+
+    failed = []
+    for index in range(0, len(names), S3_DELETE_BATCH_SIZE):
+        batch = names[index : index + S3_DELETE_BATCH_SIZE]
+        keys = {
+            storage._normalize_name(storage._clean_name(name)): name for name in batch
+        }
+        response = storage.bucket.delete_objects(
+            Delete={
+                "Objects": [{"Key": key} for key in keys],
+                "Quiet": True,
+            }
+        )
+        failed.extend(keys[error["Key"]] for error in response.get("Errors", []))
+    return failed
+
+
+def iter_files(prefix, storage=default_storage):
+    """prefix 아래의 모든 파일을 (이름, 수정 시각) 으로 반환합니다."""
+    if hasattr(storage, "bucket"):
+        # S3 는 목록 조회 결과에 수정 시각이 포함되어 있어서 파일마다 HEAD 요청을 보내지 않음
+        location = storage._normalize_name(storage._clean_name(prefix))
+        root = location[: len(location) - len(prefix)]
+        for obj in storage.bucket.objects.filter(Prefix=location.rstrip("/") + "/"):
+            yield obj.key[len(root) :], obj.last_modified
+        return
+
+    if not storage.exists(prefix):
+        return
+    directories, files = storage.listdir(prefix)
+    for file_name in files:
+        name = f"{prefix}/{file_name}"
+        yield name, storage.get_modified_time(name)
+    for directory in directories:
+        yield from iter_files(f"{prefix}/{directory}", storage)
+
+
+class StorageCleaner:
+    """
+    지울 파일 이름을 StorageDeletion 테이블에 쌓아두고, 커밋 후 워커 스레드에서 여러 개씩 한 번에 지웁니다.
+    실패한 파일은 지수 백오프 후 다시 시도하고, `POSTS_STORAGE_CLEANUP_MAX_ATTEMPTS` 번 실패하면 포기합니다.
+    `manage.py cleanup_storage` 를 주기적으로 실행하면 재시도할 파일과 어디에서도 참조하지 않는 파일을 정리합니다.
+    """
+
+    batch_size = S3_DELETE_BATCH_SIZE
+    # 가져간 파일을 지우는 데 걸릴 수 있는 최대 시간
+    lease_time = timedelta(minutes=5)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.scheduled = False
+
+    def enqueue(self, names):
+        from .models import StorageDeletion
+
+        names = {name for name in names if name}
+        if not names:
+            return
+        StorageDeletion.objects.bulk_create(
+            [StorageDeletion(name=name) for name in names],
+            ignore_conflicts=True,
+        )
+        transaction.on_commit(self.submit)
+
+    def submit(self):
+        if not settings.POSTS_STORAGE_CLEANUP_IN_BACKGROUND:
+            self.drain()
+            return
+
+        with self.lock:
+            # 이미 대기 중인 정리 작업이 있으면 그 작업이 새로 쌓인 파일도 함께 지움
+            if self.scheduled:
+                return
+            self.scheduled = True
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="storage-cleanup"
+                )
+        self.executor.submit(self.run)
+
+    def run(self):
+        with self.lock:
+            self.scheduled = False
+        try:
+            self.drain()
+        except Exception:
+            logger.exception("Unexpected error while cleaning up storage")
+        finally:
+            close_old_connections()
+
+    def drain(self):
+        """지금 지울 수 있는 파일을 모두 지우고 (지운 개수, 실패한 개수) 를 반환합니다."""
+        total_deleted = total_failed = 0
+        while True:
+            result = self.delete_batch()
+            if result is None:
+                break
+            deleted, failed = result
+            total_deleted += deleted
+            total_failed += failed
+        if total_deleted or total_failed:
+            logger.info(
+                "Deleted %d files from storage (%d failed)", total_deleted, total_failed
+            )
+        return total_deleted, total_failed
+
+    def delete_batch(self):
+        from .models import StorageDeletion
+
+        deletions = self.claim_batch()
+        if not deletions:
+            return None
+
+        # 저장소 요청은 트랜잭션과 행 잠금 없이 보냄 (느린 요청이 DB 연결과 잠금을 붙잡지 않도록 함)
+        try:
+            failed_names = set(delete_files([x.name for x in deletions]))
+            error = "Failed to delete the object"
+        except Exception as e:
+            logger.exception("Failed to delete %d files", len(deletions))
+            failed_names = {deletion.name for deletion in deletions}
+            error = repr(e)
+
+        now = timezone.now()
+        failed = [x for x in deletions if x.name in failed_names]
+        for deletion in failed:
+            deletion.attempts += 1
+            deletion.last_error = error
+            deletion.next_attempt_at = now + timedelta(
+                seconds=settings.POSTS_STORAGE_CLEANUP_RETRY_DELAY
+                * 2 ** (deletion.attempts - 1)
+            )
+        with transaction.atomic():
+            StorageDeletion.objects.filter(
+                pk__in=[x.pk for x in deletions if x.name not in failed_names]
+            ).delete()
+            StorageDeletion.objects.bulk_update(
+                failed, ["attempts", "last_error", "next_attempt_at"]
+            )
+        return len(deletions) - len(failed), len(failed)
+
+    def claim_batch(self):
+        """
+        지울 파일을 가져가고 next_attempt_at 을 lease_time 뒤로 미뤄서, 지우는 동안
+        다른 워커가 같은 파일을 가져가지 않게 합니다. (워커가 중간에 죽으면 lease 가 끝난 뒤 다시 시도함)
+        """
+        from .models import StorageDeletion
+
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = StorageDeletion.objects.filter(
+                next_attempt_at__lte=now,
+                attempts__lt=settings.POSTS_STORAGE_CLEANUP_MAX_ATTEMPTS,
+            ).order_by("id")
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            deletions = list(queryset[: self.batch_size])
+            StorageDeletion.objects.filter(pk__in=[x.pk for x in deletions]).update(
+                next_attempt_at=now + self.lease_time
+            )
+        return deletions
+
+    def sweep(self, prefix="posts", min_age=timedelta(days=1)):
+        """
+        prefix 아래의 파일 중 Post/PostImage 에서 참조하지 않는 파일을 삭제 대기열에 넣습니다.
+        업로드 중인 파일을 지우지 않도록 min_age 보다 오래된 파일만 넣습니다.
+        """
+        from .images import get_stored_names
+        from .models import ImageBlob, Post, PostImage, StorageDeletion
+
+        referenced = set(ImageBlob.objects.values_list("name", flat=True))
+        for image, variants in Post.objects.values_list(
+            "image", "image_variants"
+        ).iterator():
+            referenced.update(get_stored_names(image, variants))
+        for image, variants in PostImage.objects.values_list(
+            "image", "variants"
+        ).iterator():
+            referenced.update(get_stored_names(image, variants))
+        referenced.update(StorageDeletion.objects.values_list("name", flat=True))
+
+        modified_before = timezone.now() - min_age
+        orphaned = [
+            name
+            for name, modified_time in iter_files(prefix)
+            if name not in referenced and modified_time < modified_before
+        ]
+        self.enqueue(orphaned)
+        return orphaned
+
+
+storage_cleaner = StorageCleaner()
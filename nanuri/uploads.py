@@ -0,0 +1,144 @@
+"""
+클라이언트가 이미지를 API 서버를 거치지 않고 저장소에 바로 올릴 수 있도록 서명된 업로드 폼을 만듭니다.
+
+1. 업로드 API 가 `{"key", "url", "fields"}` 를 반환하면
+2. 클라이언트는 `fields` 와 `file` 을 multipart/form-data 로 `url` 에 POST 하고
+3. 확인(confirm) API 에 `key` 를 보내서 글/프로필에 연결합니다.
+
+운영 환경은 S3 presigned POST 를 사용하고, 로컬/테스트 환경은 같은 형식의 폼을
+LocalUploadAPIView 가 받아서 default_storage 에 저장합니다.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers, status
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# 업로드를 허용하는 Content-Type: 확장자
+ALLOWED_CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/heic": ".heic",
+}
+
+LOCAL_UPLOAD_SALT = "nanuri.uploads.local"
+
+
+def get_upload_backend():
+    return import_string(settings.UPLOADS_BACKEND)()
+
+
+def create_uploads(prefix, content_types, request=None):
+    """prefix 아래에 올릴 파일마다 서명된 업로드 폼을 만듭니다."""
+    backend = get_upload_backend()
+    uploads = []
+    for content_type in content_types:
+        name = f"{prefix}/{uuid4().hex[:8]}{ALLOWED_CONTENT_TYPES[content_type]}"
+        upload = backend.create_upload(name, content_type, request=request)
+        uploads.append({"key": name, **upload})
+    return uploads
+
+
+def validate_uploaded_keys(keys, prefix):
+    """prefix 아래에 실제로 올라온 파일인지 확인합니다."""
+    for key in keys:
+        if not key.startswith(f"{prefix}/") or ".." in key.split("/"):
+            raise ValidationError({"key": f"{key} 는 업로드할 수 없는 경로입니다."})
+        if not default_storage.exists(key):
+            raise ValidationError({"key": f"{key} 파일이 업로드되지 않았습니다."})
+    return keys
+
+
+class S3UploadBackend:
+    """S3 presigned POST (Content-Type 과 파일 크기를 정책으로 제한함)"""
+
+    def create_upload(self, name, content_type, request=None):
+        storage = default_storage
+        return storage.bucket.meta.client.generate_presigned_post(
+            Bucket=storage.bucket_name,
+            Key=storage._normalize_name(storage._clean_name(name)),
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, settings.UPLOADS_MAX_SIZE],
+            ],
+            ExpiresIn=settings.UPLOADS_EXPIRES_IN,
+        )
+
+
+class LocalUploadBackend:
+    """S3 없이 업로드 흐름을 테스트할 수 있도록 LocalUploadAPIView 로 올리는 폼을 만듭니다."""
+
+    def create_upload(self, name, content_type, request=None):
+        url = reverse("local-upload")
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        signature = signing.dumps(
+            {"key": name, "content_type": content_type}, salt=LOCAL_UPLOAD_SALT
+        )
+        return {
+            "url": url,
+            "fields": {
+                "key": name,
+                "Content-Type": content_type,
+                "signature": signature,
+            },
+        }
+
+
+# S3 presigned POST 를 대신하는 API 이므로 API 문서에는 넣지 않음
+@extend_schema(exclude=True)
+class LocalUploadAPIView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        # config.urls 는 LocalUploadBackend 를 사용할 때만 이 API 를 등록함
+        if not isinstance(get_upload_backend(), LocalUploadBackend):
+            raise NotFound()
+        try:
+            policy = signing.loads(
+                request.data.get("signature", ""),
+                salt=LOCAL_UPLOAD_SALT,
+                max_age=settings.UPLOADS_EXPIRES_IN,
+            )
+        except signing.BadSignature:
+            raise PermissionDenied("업로드 서명이 올바르지 않거나 만료되었습니다.")
+
+        if request.data.get("key") != policy["key"] or (
+            request.data.get("Content-Type") != policy["content_type"]
+        ):
+            raise PermissionDenied("업로드 폼이 서명과 일치하지 않습니다.")
+        file = request.data.get("file")
+        if file is None or not 0 < file.size <= settings.UPLOADS_MAX_SIZE:
+            raise ValidationError({"file": "파일이 없거나 너무 큽니다."})
+
+        # S3 와 같이 같은 키로 다시 올리면 덮어씀
+        default_storage.delete(policy["key"])
+        default_storage.save(policy["key"], file)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadRequestSerializer(serializers.Serializer):
+    content_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=list(ALLOWED_CONTENT_TYPES)),
+        min_length=1,
+        max_length=10,
+    )
+
+
+class UploadSerializer(serializers.Serializer):
+    key = serializers.CharField()
+    url = serializers.CharField()
+    fields = serializers.DictField(child=serializers.CharField())
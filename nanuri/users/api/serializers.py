@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from nanuri.uploads import ALLOWED_CONTENT_TYPES
+
 from ..models import User
 
 
@@ -57,3 +59,22 @@ class UserSerializer(serializers.ModelSerializer):
             },
             "last_login": {"read_only": True},
         }
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = (
+            "uuid",
+            "nickname",
+            "profile",
+        )
+        read_only_fields = fields
+
+
+class ProfileUploadRequestSerializer(serializers.Serializer):
+    content_type = serializers.ChoiceField(choices=list(ALLOWED_CONTENT_TYPES))
+
+
+class ProfileUploadConfirmSerializer(serializers.Serializer):
+    key = serializers.CharField()
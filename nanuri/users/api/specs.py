@@ -1,5 +1,13 @@
 from drf_spectacular.utils import OpenApiExample, extend_schema
 
+from nanuri.uploads import UploadSerializer
+
+from .serializers import (
+    ProfileUploadConfirmSerializer,
+    ProfileUploadRequestSerializer,
+    UserSerializer,
+)
+
 users_api_specs = {
     "get": extend_schema(
         description="<h2>회원 정보를 불러오는 API</h2>",
@@ -84,3 +92,29 @@ user_api_specs = {
         tags=["User"],
     ),
 }
+
+
+profile_upload_api_specs = {
+    "post": extend_schema(
+        description=(
+            "<h2>프로필 이미지를 저장소에 바로 올릴 수 있는 업로드 폼을 만드는 API</h2>"
+            "응답의 `fields` 와 `file` 을 multipart/form-data 로 `url` 에 POST 한 뒤 "
+            "`/users/{uuid}/profile/confirm/` 에 `key` 를 보내서 프로필에 연결합니다."
+        ),
+        summary="Create a presigned upload for the profile image",
+        tags=["User"],
+        request=ProfileUploadRequestSerializer,
+        responses=UploadSerializer,
+    ),
+}
+
+
+profile_upload_confirm_api_specs = {
+    "post": extend_schema(
+        description="<h2>업로드한 이미지를 프로필 이미지로 바꾸는 API</h2>",
+        summary="Attach the uploaded profile image",
+        tags=["User"],
+        request=ProfileUploadConfirmSerializer,
+        responses=UserSerializer,
+    ),
+}
@@ -1,10 +1,25 @@
 from django.urls import path
 
-from .views import UserListCreateAPIView, UserRetrieveUpdateDestroyAPIView
+from .views import (
+    ProfileUploadAPIView,
+    ProfileUploadConfirmAPIView,
+    UserListCreateAPIView,
+    UserRetrieveUpdateDestroyAPIView,
+)
 
 app_name = "nanuri.users.api"
 
 urlpatterns = [
     path("", UserListCreateAPIView.as_view(), name="list"),
     path("<uuid:uuid>/", UserRetrieveUpdateDestroyAPIView.as_view(), name="detail"),
+    path(
+        "<uuid:uuid>/profile/upload/",
+        ProfileUploadAPIView.as_view(),
+        name="profile-upload",
+    ),
+    path(
+        "<uuid:uuid>/profile/confirm/",
+        ProfileUploadConfirmAPIView.as_view(),
+        name="profile-upload-confirm",
+    ),
 ]
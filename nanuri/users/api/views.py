@@ -1,17 +1,39 @@
+from django.db import transaction
+from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema_view
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from nanuri.mixins import (
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    StreamingListMixin,
+)
+from nanuri.pagination import CursorOrLimitOffsetPagination
+from nanuri.posts.storage import storage_cleaner
+from nanuri.uploads import UploadSerializer, create_uploads, validate_uploaded_keys
 
 from ..models import User
 from . import specs
-from .serializers import UserSerializer
+from .serializers import (
+    ProfileUploadConfirmSerializer,
+    ProfileUploadRequestSerializer,
+    UserSerializer,
+)
 
 
 @extend_schema_view(**specs.users_api_specs)
-class UserListCreateAPIView(ListCreateAPIView):
+class UserListCreateAPIView(
+    StreamingListMixin, ConditionalListMixin, ListCreateAPIView
+):
     permission_classes = [IsAuthenticated]
     queryset = User.objects.all().order_by("created_at")
     serializer_class = UserSerializer
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ("created_at", "id")
 
     def get_queryset(self):
         queryset = self.queryset
@@ -21,8 +43,57 @@ class UserListCreateAPIView(ListCreateAPIView):
 
 
 @extend_schema_view(**specs.user_api_specs)
-class UserRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+class UserRetrieveUpdateDestroyAPIView(
+    ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView
+):
     permission_classes = [IsAuthenticated]
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = "uuid"
+
+
+class ProfileUploadMixin:
+    permission_classes = [IsAuthenticated]
+
+    def get_user(self, uuid):
+        user = get_object_or_404(User, uuid=uuid)
+        if user.pk != self.request.user.pk:
+            raise PermissionDenied("본인의 프로필 이미지만 바꿀 수 있습니다.")
+        return user
+
+    def get_upload_prefix(self, user):
+        return f"users/{user.uuid}"
+
+
+@extend_schema_view(**specs.profile_upload_api_specs)
+class ProfileUploadAPIView(ProfileUploadMixin, APIView):
+    def post(self, request, uuid):
+        user = self.get_user(uuid)
+        serializer = ProfileUploadRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        [upload] = create_uploads(
+            self.get_upload_prefix(user),
+            [serializer.validated_data["content_type"]],
+            request=request,
+        )
+        return Response(UploadSerializer(upload).data)
+
+
+@extend_schema_view(**specs.profile_upload_confirm_api_specs)
+class ProfileUploadConfirmAPIView(ProfileUploadMixin, APIView):
+    def post(self, request, uuid):
+        user = self.get_user(uuid)
+        serializer = ProfileUploadConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        key = serializer.validated_data["key"]
+        prefix = self.get_upload_prefix(user)
+        validate_uploaded_keys([key], prefix)
+
+        with transaction.atomic():
+            # 이전에 업로드 API 로 올린 프로필 이미지만 지움 (외부 URL 등은 그대로 둠)
+            if user.profile and user.profile.name.startswith(f"{prefix}/"):
+                if user.profile.name != key:
+                    storage_cleaner.enqueue([user.profile.name])
+            user.profile = key
+            user.save(update_fields=["profile", "updated_at"])
+        return Response(UserSerializer(user, context={"request": request}).data)
@@ -1,10 +1,13 @@
 import io
 
 import pytest
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 from rest_framework.test import APIClient
 
+from nanuri.posts.counters import view_count_buffer
+
 from .notifications.factories import DeviceFactory, SubscriptionFactory
 from .posts.factories import (
     CommentFactory,
@@ -17,7 +20,10 @@ from .users.factories import UserFactory
 
 @pytest.fixture(autouse=True)
 def run_around_tests():
+    cache.clear()
+    view_count_buffer.clear()
     yield
+    view_count_buffer.clear()
 
 
 @pytest.fixture
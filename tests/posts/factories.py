@@ -34,6 +34,7 @@ class PostFactory(DjangoModelFactory):
     waited_until = factory.LazyAttribute(lambda x: x.waited_from + timedelta(days=3))
 
     writer = factory.SubFactory(UserFactory)
+    location = factory.LazyAttribute(lambda x: x.writer.location)
     category = FuzzyChoice(
         choices=["BATHROOM", "FOOD", "KITCHEN", "HOUSEHOLD", "STATIONERY", "ETC"]
     )
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from freezegun import freeze_time
+
+from nanuri.pagination import encode_cursor
+from nanuri.posts.models import Post, PostTombstone
+
+from .factories import PostFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_safety_window(settings):
+    settings.POSTS_CHANGES_SAFETY_WINDOW = 0
+
+
+def get_changes(client, **params):
+    response = client.get(reverse("nanuri.posts.api:changes"), data=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestPostChanges:
+    def test_sync(self, user_client):
+        posts = PostFactory.create_batch(size=3)
+        result = get_changes(user_client)
+
+        assert [x["uuid"] for x in result["posts"]] == [str(x.uuid) for x in posts]
+        assert result["deleted"] == []
+        assert not result["has_more"]
+
+        result = get_changes(user_client, since=result["cursor"])
+        assert result["posts"] == []
+
+        updated, deleted = posts[:2]
+        updated.title = "수정된 제목"
+        updated.save()
+        deleted_uuid = str(deleted.uuid)
+        user_client.delete(
+            reverse("nanuri.posts.api:detail", kwargs={"uuid": deleted.uuid})
+        )
+        created = PostFactory.create()
+
+        result = get_changes(user_client, since=result["cursor"])
+        assert [x["uuid"] for x in result["posts"]] == [
+            str(updated.uuid),
+            str(created.uuid),
+        ]
+        assert result["posts"][0]["title"] == "수정된 제목"
+        assert result["deleted"] == [deleted_uuid]
+
+    def test_sync_with_limit(self, user_client):
+        posts = PostFactory.create_batch(size=5)
+        uuids = []
+        result = {"cursor": "", "has_more": True}
+        while result["has_more"]:
+            result = get_changes(user_client, since=result["cursor"], limit=2)
+            uuids.extend(x["uuid"] for x in result["posts"])
+
+        assert uuids == [str(x.uuid) for x in posts]
+
+    def test_safety_window(self, user_client, settings):
+        settings.POSTS_CHANGES_SAFETY_WINDOW = 60
+        post = PostFactory.create()
+
+        result = get_changes(user_client)
+        # 방금 수정된 글은 늦게 커밋된 변경을 놓치지 않도록 다음 요청에서도 다시 반환함
+        result = get_changes(user_client, since=result["cursor"])
+        assert [x["uuid"] for x in result["posts"]] == [str(post.uuid)]
+
+    def test_sync_without_deletions_does_not_expire(self, user_client, settings):
+        settings.POSTS_TOMBSTONE_RETENTION_DAYS = 2
+        PostFactory.create()
+        result = get_changes(user_client)
+
+        # 삭제된 글이 없어도 주기적으로 동기화하면 커서가 보관 기간을 넘기지 않음
+        for days in range(1, 5):
+            with freeze_time(timezone.now() + timedelta(days=days)):
+                result = get_changes(user_client, since=result["cursor"])
+                assert result["posts"] == []
+                assert result["deleted"] == []
+
+    def test_tombstone_on_cascade(self, user_client, post):
+        post.writer.delete()
+
+        assert PostTombstone.objects.filter(uuid=post.uuid).exists()
+        assert not Post.objects.filter(pk=post.pk).exists()
+
+    def test_expired_cursor(self, user_client):
+        since = encode_cursor([None, None, timezone.now() - timedelta(days=365), 0])
+        response = user_client.get(
+            reverse("nanuri.posts.api:changes"), data={"since": since}
+        )
+
+        assert response.status_code == 410
+
+    def test_invalid_cursor(self, user_client):
+        response = user_client.get(
+            reverse("nanuri.posts.api:changes"), data={"since": "invalid"}
+        )
+
+        assert response.status_code == 404
@@ -0,0 +1,29 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from nanuri.posts.models import Post
+
+pytestmark = pytest.mark.django_db
+
+
+class TestBenchmarkFeedCommand:
+    def test_benchmark_feed(self):
+        stdout = StringIO()
+        call_command(
+            "benchmark_feed",
+            posts=50,
+            users=5,
+            comments=100,
+            sub_comments=50,
+            repeat=1,
+            stdout=stdout,
+        )
+        output = stdout.getvalue()
+
+        assert "== latest ==" in output
+        assert "== deep page (keyset) ==" in output
+        assert "== nearest 10 ==" in output
+        assert "== latest with comment_count (denormalized) ==" in output
+        assert Post.objects.count() == 0
@@ -1,9 +1,11 @@
+from uuid import uuid4
+
 import pytest
 from django.urls import reverse
 
 from nanuri.posts.models import Comment
 
-from .factories import CommentFactory
+from .factories import CommentFactory, SubCommentFactory
 
 pytestmark = pytest.mark.django_db
 
@@ -17,6 +19,51 @@ class TestCommentEndpoints:
         assert response.status_code == 200
         assert len(result["results"]) == len(comments)
 
+    def test_list_with_cursor_pagination(self, user_client, post):
+        comments = CommentFactory.create_batch(post=post, size=7)
+        url = reverse("nanuri.posts.api:comment-list") + "?cursor=&limit=3"
+        uuids = []
+        while url is not None:
+            result = user_client.get(url).json()
+            uuids.extend(comment["uuid"] for comment in result["results"])
+            url = result["next"]
+
+        assert sorted(uuids) == sorted(str(comment.uuid) for comment in comments)
+
+    @pytest.mark.parametrize("ordering", ["oldest", "newest"])
+    def test_list_by_post_with_ordering(self, user_client, post, ordering):
+        comments = CommentFactory.create_batch(post=post, size=5)
+        CommentFactory.create()
+        if ordering == "newest":
+            comments.reverse()
+        url = reverse("nanuri.posts.api:comment-list")
+        url += f"?post={post.uuid}&ordering={ordering}&cursor=&limit=2"
+        uuids = []
+        while url is not None:
+            result = user_client.get(url).json()
+            uuids.extend(comment["uuid"] for comment in result["results"])
+            url = result["next"]
+
+        assert uuids == [str(comment.uuid) for comment in comments]
+
+    def test_list_with_invalid_ordering(self, user_client):
+        response = user_client.get(
+            reverse("nanuri.posts.api:comment-list"), {"ordering": "random"}
+        )
+        assert response.status_code == 400
+
+    def test_list_by_unknown_post(self, user_client, comment):
+        response = user_client.get(
+            reverse("nanuri.posts.api:comment-list"), {"post": str(uuid4())}
+        )
+        assert response.status_code == 200
+        assert response.json()["results"] == []
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:comment-list"), {"post": "not-a-uuid"}
+        )
+        assert response.status_code == 400
+
     def test_create(self, user_client, user, post):
         comment = CommentFactory.build(post=post)
         response = user_client.post(
@@ -50,6 +97,19 @@ class TestCommentEndpoints:
         assert result["uuid"] == str(comment.uuid)
         assert result["text"] == comment.text
 
+    def test_retrieve_not_modified(self, user_client, comment):
+        url = reverse("nanuri.posts.api:comment-detail", kwargs={"uuid": comment.uuid})
+        etag = user_client.get(url)["ETag"]
+
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        comment.text = "수정된 댓글"
+        comment.save()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["text"] == "수정된 댓글"
+
     def test_update(self, user_client, comment):
         new_comment = CommentFactory.create()
         response = user_client.put(
@@ -76,3 +136,71 @@ class TestCommentEndpoints:
         )
         assert response.status_code == 204
         assert Comment.objects.filter(uuid=str(comment.uuid)).count() == 0
+
+
+class TestPostCommentThreadEndpoint:
+    def test_list(self, user_client, post):
+        comments = CommentFactory.create_batch(post=post, size=2)
+        sub_comments = SubCommentFactory.create_batch(comment=comments[0], size=2)
+        CommentFactory.create()
+        response = user_client.get(
+            reverse("nanuri.posts.api:comment-thread", kwargs={"uuid": post.uuid})
+        )
+        result = response.json()
+
+        assert response.status_code == 200
+        assert [x["uuid"] for x in result["results"]] == [
+            str(comment.uuid) for comment in comments
+        ]
+        assert [x["uuid"] for x in result["results"][0]["sub_comments"]] == [
+            str(sub_comment.uuid) for sub_comment in sub_comments
+        ]
+        assert result["results"][0]["more_sub_comments"] is None
+        assert result["results"][1]["sub_comments"] == []
+
+    def test_list_more_sub_comments(self, user_client, comment):
+        sub_comments = SubCommentFactory.create_batch(comment=comment, size=5)
+        response = user_client.get(
+            reverse(
+                "nanuri.posts.api:comment-thread", kwargs={"uuid": comment.post.uuid}
+            ),
+            data={"sub_comments_limit": 2},
+        )
+        thread = response.json()["results"][0]
+        uuids = [x["uuid"] for x in thread["sub_comments"]]
+
+        assert len(uuids) == 2
+        url = thread["more_sub_comments"]
+        while url is not None:
+            result = user_client.get(url).json()
+            uuids.extend(x["uuid"] for x in result["results"])
+            url = result["next"]
+        assert uuids == [str(sub_comment.uuid) for sub_comment in sub_comments]
+
+    def test_list_with_cursor_pagination(self, user_client, post):
+        comments = CommentFactory.create_batch(post=post, size=5)
+        url = reverse("nanuri.posts.api:comment-thread", kwargs={"uuid": post.uuid})
+        url += "?limit=2"
+        uuids = []
+        while url is not None:
+            result = user_client.get(url).json()
+            uuids.extend(comment["uuid"] for comment in result["results"])
+            url = result["next"]
+
+        assert uuids == [str(comment.uuid) for comment in comments]
+
+    def test_list_unknown_post(self, user_client):
+        response = user_client.get(
+            reverse("nanuri.posts.api:comment-thread", kwargs={"uuid": uuid4()})
+        )
+        assert response.status_code == 404
+
+    def test_list_query_budget(self, user_client, post, django_assert_max_num_queries):
+        for comment in CommentFactory.create_batch(post=post, size=5):
+            SubCommentFactory.create_batch(comment=comment, size=4)
+        url = reverse("nanuri.posts.api:comment-thread", kwargs={"uuid": post.uuid})
+
+        # 글 한 번, 댓글 한 번, 대댓글 한 번
+        with django_assert_max_num_queries(3):
+            response = user_client.get(url)
+        assert response.status_code == 200
@@ -0,0 +1,86 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from nanuri.posts.expiry import expire_posts
+from nanuri.posts.models import Post
+from nanuri.posts.signals import post_expired
+
+from .factories import PostFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def expired_posts():
+    waited_until = timezone.localdate() - timedelta(days=1)
+    return [
+        PostFactory.create(
+            waited_until=waited_until, min_participants=3, num_participants=2
+        ),
+        PostFactory.create(
+            waited_until=waited_until, min_participants=3, num_participants=3
+        ),
+    ]
+
+
+class TestPostExpiry:
+    def test_expire_posts(self, expired_posts, django_capture_on_commit_callbacks):
+        waiting_post = PostFactory.create(waited_until=timezone.localdate())
+        sent = []
+
+        def receiver(sender, posts, **kwargs):
+            sent.extend(post.pk for post in posts)
+
+        post_expired.connect(receiver)
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                assert expire_posts(batch_size=1) == 2
+        finally:
+            post_expired.disconnect(receiver)
+
+        cancelled, ordering = (Post.objects.get(pk=x.pk) for x in expired_posts)
+        assert cancelled.order_status == Post.OrderStatus.CANCELLED
+        assert ordering.order_status == Post.OrderStatus.ORDERING
+        assert Post.objects.get(pk=waiting_post.pk).order_status == "WAITING"
+        assert sorted(sent) == sorted(x.pk for x in expired_posts)
+
+    def test_expire_posts_command(self, expired_posts):
+        call_command("expire_posts", stdout=io.StringIO())
+
+        assert not Post.objects.expired(timezone.localdate()).exists()
+
+    def test_feed_excludes_closed_posts(self, user_client, expired_posts):
+        waiting_post = PostFactory.create(waited_until=timezone.localdate())
+        expire_posts()
+
+        response = user_client.get(reverse("nanuri.posts.api:list"))
+        assert [x["uuid"] for x in response.json()["results"]] == [
+            str(waiting_post.uuid)
+        ]
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"), {"order_status": "CANCELLED"}
+        )
+        assert [x["uuid"] for x in response.json()["results"]] == [
+            str(expired_posts[0].uuid)
+        ]
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"),
+            {"user": str(expired_posts[1].writer.uuid)},
+        )
+        assert [x["uuid"] for x in response.json()["results"]] == [
+            str(expired_posts[1].uuid)
+        ]
+
+    def test_invalid_order_status(self, user_client):
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"), {"order_status": "UNKNOWN"}
+        )
+
+        assert response.status_code == 400
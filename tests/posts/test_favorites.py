@@ -0,0 +1,69 @@
+import pytest
+from django.urls import reverse
+
+from .factories import PostFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def favorite_url(post):
+    return reverse("nanuri.posts.api:favorite", kwargs={"uuid": post.uuid})
+
+
+class TestPostFavoriteEndpoint:
+    def test_favorite(self, user_client, user, post):
+        response = user_client.post(favorite_url(post))
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "uuid": str(post.uuid),
+            "favorite_count": 1,
+            "is_favorited": True,
+        }
+        assert list(user.favorite_posts.all()) == [post]
+
+    def test_favorite_twice(self, user_client, post):
+        user_client.post(favorite_url(post))
+        response = user_client.post(favorite_url(post))
+
+        assert response.json()["favorite_count"] == 1
+
+    def test_unfavorite(self, user_client, user, post):
+        user_client.post(favorite_url(post))
+
+        response = user_client.delete(favorite_url(post))
+
+        assert response.status_code == 200
+        assert response.json()["favorite_count"] == 0
+        assert response.json()["is_favorited"] is False
+        assert not user.favorite_posts.exists()
+
+    def test_favorite_count_is_maintained(self, user, post):
+        other_post = PostFactory.create()
+
+        user.favorite_posts.add(post, other_post)
+        post.favored_by.add(PostFactory.create().writer)
+        post.refresh_from_db()
+        other_post.refresh_from_db()
+        assert (post.favorite_count, other_post.favorite_count) == (2, 1)
+
+        user.favorite_posts.clear()
+        post.refresh_from_db()
+        other_post.refresh_from_db()
+        assert (post.favorite_count, other_post.favorite_count) == (1, 0)
+
+    def test_is_favorited(self, user_client, user):
+        favorite_post = PostFactory.create()
+        other_post = PostFactory.create()
+        favorite_post.favored_by.add(user, other_post.writer)
+
+        response = user_client.get(reverse("nanuri.posts.api:list"))
+        results = {x["uuid"]: x for x in response.json()["results"]}
+        assert results[str(favorite_post.uuid)]["is_favorited"] is True
+        assert results[str(favorite_post.uuid)]["favorite_count"] == 2
+        assert results[str(other_post.uuid)]["is_favorited"] is False
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:detail", kwargs={"uuid": favorite_post.uuid})
+        )
+        assert response.json()["is_favorited"] is True
@@ -0,0 +1,127 @@
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from nanuri.posts.images import FAILED_VARIANT, VARIANT_SIZES, process_post_images
+from nanuri.posts.models import Post
+
+from .factories import PostFactory, PostImageFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def make_image_file(width=1600, height=1200):
+    image = Image.new("RGB", (width, height), (0, 255, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG")
+    return SimpleUploadedFile("photo.jpeg", buffer.getvalue(), "image/jpeg")
+
+
+class TestPostImagePipeline:
+    def test_create_variants(self, post):
+        post.image = make_image_file()
+        post.save()
+
+        process_post_images(post.pk)
+
+        post.refresh_from_db()
+        assert set(post.image_variants) == set(VARIANT_SIZES)
+        for variant, size in VARIANT_SIZES.items():
+            assert set(post.image_variants[variant]) == {"jpg", "webp"}
+            for name in post.image_variants[variant].values():
+                with default_storage.open(name) as f:
+                    assert max(Image.open(f).size) == size
+
+    def test_create_variants_after_commit(
+        self, user_client, django_capture_on_commit_callbacks
+    ):
+        post = PostFactory.build()
+        with django_capture_on_commit_callbacks(execute=True):
+            response = user_client.post(
+                reverse("nanuri.posts.api:list"),
+                data={
+                    "title": post.title,
+                    "unit_price": post.unit_price,
+                    "quantity": post.quantity,
+                    "description": post.description,
+                    "min_participants": post.min_participants,
+                    "max_participants": post.max_participants,
+                    "product_url": post.product_url,
+                    "image": make_image_file(),
+                    "images": [make_image_file(), make_image_file()],
+                },
+                format="multipart",
+            )
+
+        assert response.status_code == 201
+        # 응답에는 아직 변형이 없음 (요청이 끝난 뒤에 만들어짐)
+        assert response.json()["image_variants"] == {}
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:detail", kwargs={"uuid": response.json()["uuid"]})
+        )
+        result = response.json()
+        assert result["image_variants"]["thumbnail"]["webp"].endswith("_thumbnail.webp")
+        assert len(result["post_images"]) == 2
+        for post_image in result["post_images"]:
+            assert post_image["variants"]["medium"]["jpg"].endswith("_medium.jpg")
+
+    def test_processed_post_is_modified(self, user_client, post):
+        post.image = make_image_file()
+        post.save()
+        PostImageFactory.create(post=post, image=make_image_file())
+        url = reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+        response = user_client.get(url)
+        assert response.json()["image_variants"] == {}
+
+        process_post_images(post.pk)
+
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 200
+        result = response.json()
+        assert result["image_variants"] != {}
+        assert result["post_images"][0]["variants"] != {}
+
+    def test_invalid_image_is_skipped(self, post):
+        post_image = PostImageFactory.create(post=post)
+
+        process_post_images(post.pk)
+
+        post_image.refresh_from_db()
+        assert post_image.variants == {}
+
+    def test_undecodable_image_is_marked(self, user_client, post):
+        post.image = SimpleUploadedFile("broken.jpg", b"not an image", "image/jpeg")
+        post.save()
+        PostFactory.create(image=None)
+
+        call_command("process_post_images", stdout=io.StringIO())
+
+        post.refresh_from_db()
+        assert post.image_variants == {FAILED_VARIANT: {}}
+        stdout = io.StringIO()
+        call_command("process_post_images", stdout=stdout)
+        assert stdout.getvalue() == ""
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+        )
+        assert response.json()["image_variants"] == {}
+
+    def test_process_post_images_command(self, post):
+        post.image = make_image_file(width=300, height=300)
+        post.save()
+        processed_post = PostFactory.create(image_variants={"thumbnail": {}})
+
+        call_command("process_post_images", stdout=io.StringIO())
+
+        post.refresh_from_db()
+        assert set(post.image_variants) == set(VARIANT_SIZES)
+        assert Post.objects.get(pk=processed_post.pk).image_variants == {
+            "thumbnail": {}
+        }
@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from nanuri.posts.models import Post
+
+from ..users.factories import UserFactory
+from .factories import PostFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def participants_url(post):
+    return reverse("nanuri.posts.api:participants", kwargs={"uuid": post.uuid})
+
+
+class TestPostParticipantsEndpoint:
+    def test_join(self, user_client, user):
+        post = PostFactory.create(num_participants=1, max_participants=3)
+
+        response = user_client.post(participants_url(post))
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["num_participants"] == 2
+        assert result["is_participating"] is True
+        post.refresh_from_db()
+        assert post.num_participants == 2
+        assert list(post.participants.all()) == [user]
+
+    def test_join_twice(self, user_client):
+        post = PostFactory.create(num_participants=1, max_participants=3)
+
+        user_client.post(participants_url(post))
+        response = user_client.post(participants_url(post))
+
+        assert response.status_code == 200
+        assert response.json()["num_participants"] == 2
+
+    def test_join_full_post(self, user_client):
+        post = PostFactory.create(num_participants=3, max_participants=3)
+
+        response = user_client.post(participants_url(post))
+
+        assert response.status_code == 409
+        post.refresh_from_db()
+        assert post.num_participants == 3
+        assert not post.participants.exists()
+
+    def test_join_closed_post(self, user_client):
+        post = PostFactory.create(
+            num_participants=1,
+            max_participants=3,
+            order_status=Post.OrderStatus.ORDERING,
+        )
+
+        response = user_client.post(participants_url(post))
+
+        assert response.status_code == 409
+
+    def test_leave(self, user_client, user):
+        post = PostFactory.create(num_participants=1, max_participants=3)
+        user_client.post(participants_url(post))
+
+        response = user_client.delete(participants_url(post))
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["num_participants"] == 1
+        assert result["is_participating"] is False
+        assert not post.participants.filter(pk=user.pk).exists()
+
+    def test_leave_without_joining(self, user_client):
+        post = PostFactory.create(num_participants=1, max_participants=3)
+
+        response = user_client.delete(participants_url(post))
+
+        assert response.status_code == 200
+        assert response.json()["num_participants"] == 1
+
+    def test_writer_cannot_leave(self, user_client, user):
+        post = PostFactory.create(writer=user)
+
+        response = user_client.delete(participants_url(post))
+
+        assert response.status_code == 400
+
+    # SQLite 는 데이터베이스 전체를 잠그기 때문에 동시성 테스트는 PostGIS 에서만 실행함
+    @pytest.mark.skipif(
+        condition=settings.DATABASES["default"]["ENGINE"]
+        != "django.contrib.gis.db.backends.postgis",
+        reason="PostGIS 데이터베이스를 사용하지 않습니다",
+    )
+    @pytest.mark.django_db(transaction=True)
+    def test_join_concurrently(self):
+        post = PostFactory.create(num_participants=1, max_participants=10)
+        users = UserFactory.create_batch(size=50)
+        barrier = threading.Barrier(len(users))
+        status_codes = []
+
+        def join(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                status_codes.append(client.post(participants_url(post)).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=join, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        post.refresh_from_db()
+        assert post.num_participants == 10
+        assert post.participants.count() == 9
+        assert status_codes.count(200) == 9
+        assert status_codes.count(409) == 41
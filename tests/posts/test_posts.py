@@ -1,17 +1,33 @@
+import io
+
 import pytest
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from PIL import Image
 from rest_framework.test import APIClient
 
-from nanuri.posts.models import Post
+from nanuri.pagination import encode_cursor
+from nanuri.posts import search
+from nanuri.posts.counters import view_count_buffer
+from nanuri.posts.models import Comment, Post, PostImage
+from nanuri.posts.storage import storage_cleaner
 
-from .factories import PostFactory
+from .factories import CommentFactory, PostFactory, PostImageFactory, SubCommentFactory
 
 pytestmark = pytest.mark.django_db
 
 
+def make_image_file(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (100, 100), color).save(buffer, format="JPEG")
+    return SimpleUploadedFile(f"{color}.jpeg", buffer.getvalue(), "image/jpeg")
+
+
 class TestPostEndpoints:
     def test_list(self, user_client):
         posts = PostFactory.create_batch(size=3)
@@ -32,6 +48,157 @@ class TestPostEndpoints:
         assert response.status_code == 200
         assert len(result["results"]) == 20
 
+    def test_list_with_cursor_pagination(self, user_client):
+        posts = PostFactory.create_batch(size=25)
+        url = reverse("nanuri.posts.api:list") + "?cursor=&limit=10"
+        uuids = []
+        while url is not None:
+            with CaptureQueriesContext(connection) as context:
+                response = user_client.get(url)
+            result = response.json()
+
+            assert response.status_code == 200
+            assert "count" not in result
+            assert not any("COUNT(" in q["sql"] for q in context.captured_queries)
+            uuids.extend(post["uuid"] for post in result["results"])
+            url = result["next"]
+
+        expected = sorted(posts, key=lambda x: (x.created_at, x.id), reverse=True)
+        assert uuids == [str(post.uuid) for post in expected]
+
+    def test_list_with_invalid_cursor(self, user_client):
+        response = user_client.get(reverse("nanuri.posts.api:list"), {"cursor": "x"})
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "position",
+        [[{"x": 1}, 5], [["2022-01-01"], 5], ["not a datetime", 5], [None, "x"]],
+    )
+    def test_list_with_malformed_cursor(self, user_client, position):
+        PostFactory.create()
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"), {"cursor": encode_cursor(position)}
+        )
+        assert response.status_code == 404
+
+    def test_list_query_count_does_not_grow_with_posts(self, user_client):
+        def count_list_queries(num_posts):
+            Post.objects.all().delete()
+            for post in PostFactory.create_batch(size=num_posts):
+                PostImageFactory.create_batch(size=2, post=post)
+                post.participants.add(post.writer)
+            with CaptureQueriesContext(connection) as context:
+                response = user_client.get(reverse("nanuri.posts.api:list"))
+            assert response.status_code == 200
+            assert len(response.json()["results"]) == num_posts
+            return len(context.captured_queries)
+
+        assert count_list_queries(1) == count_list_queries(10)
+
+    def test_list_query_budget(self, user_client, django_assert_max_num_queries):
+        for post in PostFactory.create_batch(size=10):
+            PostImageFactory.create_batch(size=2, post=post)
+
+        with django_assert_max_num_queries(5):
+            response = user_client.get(reverse("nanuri.posts.api:list"))
+
+        assert response.status_code == 200
+
+    def test_list_with_expanded_writer_query_budget(
+        self, user_client, django_assert_max_num_queries
+    ):
+        PostFactory.create_batch(size=10)
+
+        with django_assert_max_num_queries(8):
+            response = user_client.get(
+                reverse("nanuri.posts.api:list"), {"expand": "writer"}
+            )
+
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize("source", ["denormalized", "subquery"])
+    def test_list_comment_count(
+        self,
+        user_client,
+        settings,
+        source,
+        django_assert_max_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.POSTS_COMMENT_COUNT_SOURCE = source
+        post, other_post = PostFactory.create_batch(size=2)
+        with django_capture_on_commit_callbacks(execute=True):
+            comments = CommentFactory.create_batch(size=2, post=post)
+            SubCommentFactory.create_batch(size=3, comment=comments[0])
+
+        with django_assert_max_num_queries(5):
+            response = user_client.get(reverse("nanuri.posts.api:list"))
+
+        results = {x["uuid"]: x for x in response.json()["results"]}
+        assert results[str(post.uuid)]["comment_count"] == 5
+        assert results[str(other_post.uuid)]["comment_count"] == 0
+
+    def test_comment_count_is_maintained(
+        self, post, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            comment, other_comment = CommentFactory.create_batch(size=2, post=post)
+            SubCommentFactory.create_batch(size=2, comment=comment)
+            SubCommentFactory.create(comment=other_comment).delete()
+        post.refresh_from_db()
+        assert post.comment_count == 4
+
+        with django_capture_on_commit_callbacks(execute=True):
+            comment.delete()
+        post.refresh_from_db()
+        assert post.comment_count == 1
+
+    def test_comment_count_is_updated_once_per_post(
+        self, post, django_capture_on_commit_callbacks
+    ):
+        comments = CommentFactory.create_batch(size=3, post=post)
+        for comment in comments:
+            SubCommentFactory.create_batch(size=2, comment=comment)
+
+        with CaptureQueriesContext(connection) as queries:
+            with django_capture_on_commit_callbacks(execute=True):
+                Comment.objects.filter(post=post).delete()
+
+        updates = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(f'UPDATE "{Post._meta.db_table}"')
+        ]
+        assert len(updates) == 1
+        post.refresh_from_db()
+        assert post.comment_count == 0
+
+    def test_comment_count_is_not_updated_for_deleted_post(
+        self, post, django_capture_on_commit_callbacks
+    ):
+        SubCommentFactory.create_batch(size=3, comment=CommentFactory(post=post))
+
+        with CaptureQueriesContext(connection) as queries:
+            with django_capture_on_commit_callbacks(execute=True):
+                post.delete()
+
+        assert not any(
+            query["sql"].startswith(f'UPDATE "{Post._meta.db_table}"')
+            for query in queries.captured_queries
+        )
+
+    def test_retrieve_query_budget(
+        self, user_client, post_image, django_assert_max_num_queries
+    ):
+        with django_assert_max_num_queries(4):
+            response = user_client.get(
+                reverse(
+                    "nanuri.posts.api:detail", kwargs={"uuid": post_image.post.uuid}
+                )
+            )
+
+        assert response.status_code == 200
+
     # FIXME: Raw SQL 쿼리 날리지 말고 함수로 거리 계산하도록 수정하기
     #  django.contrib.gis.geos.Point 클래스에서 제공하는 distance 메서드는 2d 거리를 계산해서 정확하지 않음
     @pytest.mark.skipif(
@@ -55,7 +222,7 @@ class TestPostEndpoints:
         assert response.status_code == 200
         with connection.cursor() as cursor:
             for result in response.json()["results"]:
-                writer = get_user_model().objects.get(email=result["writer"]["email"])
+                writer = get_user_model().objects.get(uuid=result["writer"]["uuid"])
                 sql = (
                     "SELECT ST_DistanceSphere("
                     "'SRID=4326;POINT (%s %s)'::geometry, "
@@ -75,6 +242,105 @@ class TestPostEndpoints:
                 distance = row[0]
                 assert distance < max_distance_in_meter
 
+    def test_list_within_distance(self, user):
+        user.location = "SRID=4326;POINT (127.0276 37.4979)"
+        user.save()
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+        near_post = PostFactory.create(location="SRID=4326;POINT (127.0286 37.4989)")
+        PostFactory.create(location="SRID=4326;POINT (129.0756 35.1796)")
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"),
+            data={"distance": 1000},
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["uuid"] for result in results] == [str(near_post.uuid)]
+
+    def test_list_within_distance_uses_cached_candidates(self, user):
+        user.location = "SRID=4326;POINT (127.0276 37.4979)"
+        user.save()
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+        post = PostFactory.create(location="SRID=4326;POINT (127.0286 37.4989)")
+        url = reverse("nanuri.posts.api:list")
+
+        with CaptureQueriesContext(connection) as cache_miss:
+            response = user_client.get(url, {"distance": 1000})
+        assert [x["uuid"] for x in response.json()["results"]] == [str(post.uuid)]
+
+        with CaptureQueriesContext(connection) as cache_hit:
+            response = user_client.get(url, {"distance": 1000})
+        assert [x["uuid"] for x in response.json()["results"]] == [str(post.uuid)]
+        assert len(cache_hit) == len(cache_miss) - 1
+
+        new_post = PostFactory.create(location="SRID=4326;POINT (127.0277 37.4980)")
+        response = user_client.get(url, {"distance": 1000})
+        assert [x["uuid"] for x in response.json()["results"]] == [
+            str(new_post.uuid),
+            str(post.uuid),
+        ]
+
+        post.delete()
+        response = user_client.get(url, {"distance": 1000})
+        assert [x["uuid"] for x in response.json()["results"]] == [str(new_post.uuid)]
+
+    def test_list_nearest_posts(self, user):
+        user.location = "SRID=4326;POINT (127.0276 37.4979)"
+        user.save()
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+        far_post = PostFactory.create(location="SRID=4326;POINT (129.0756 35.1796)")
+        near_post = PostFactory.create(location="SRID=4326;POINT (127.0286 37.4989)")
+        PostFactory.create(location="SRID=4326;POINT (126.7052 37.4563)")
+        PostFactory.create(
+            location="SRID=4326;POINT (127.0277 37.4979)",
+            is_published=False,
+        )
+
+        response = user_client.get(reverse("nanuri.posts.api:list"), {"nearest": 2})
+
+        assert response.status_code == 200
+        results = response.json()
+        assert len(results) == 2
+        assert results[0]["uuid"] == str(near_post.uuid)
+        assert str(far_post.uuid) not in [result["uuid"] for result in results]
+
+    def test_list_nearest_posts_without_location(self, user):
+        user.location = None
+        user.save()
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+
+        response = user_client.get(reverse("nanuri.posts.api:list"), {"nearest": 2})
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("distance", ["abc", "0", "-1", "nan"])
+    def test_list_with_invalid_distance(self, user, distance):
+        user.location = "SRID=4326;POINT (127.0276 37.4979)"
+        user.save()
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"), {"distance": distance}
+        )
+
+        assert response.status_code == 400
+
+    def test_list_within_distance_without_location(self, user):
+        user.location = None
+        user.save()
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+
+        response = user_client.get(reverse("nanuri.posts.api:list"), {"distance": 1000})
+
+        assert response.status_code == 400
+
     def test_list_by_category(self, user_client):
         for category in Post.Category.values:
             PostFactory.create_batch(size=2, category=category)
@@ -101,6 +367,94 @@ class TestPostEndpoints:
         results = response.json()["results"]
         assert len(results) == 4
 
+    def test_search(self, user_client):
+        in_description = PostFactory.create(title="음료 공동구매", description="콜라 같이 사실 분")
+        in_title = PostFactory.create(title="콜라 공동구매", description="음료")
+        PostFactory.create(title="휴지 공동구매", description="생활용품")
+
+        response = user_client.get(reverse("nanuri.posts.api:list"), {"q": "콜라"})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["uuid"] for result in results] == [
+            str(in_title.uuid),
+            str(in_description.uuid),
+        ]
+
+    def test_search_requires_all_terms(self, user_client):
+        post = PostFactory.create(title="콜라 공동구매", description="제로 콜라")
+        PostFactory.create(title="콜라 공동구매", description="일반 콜라")
+
+        response = user_client.get(reverse("nanuri.posts.api:list"), {"q": "콜라 제로"})
+
+        results = response.json()["results"]
+        assert [result["uuid"] for result in results] == [str(post.uuid)]
+
+    def test_search_with_cursor_pagination(self, user_client):
+        PostFactory.create_batch(size=5, title="콜라 공동구매")
+        PostFactory.create_batch(size=5, title="음료", description="콜라")
+        url = reverse("nanuri.posts.api:list")
+
+        uuids = []
+        response = user_client.get(url, {"q": "콜라", "cursor": "", "limit": 3})
+        while True:
+            data = response.json()
+            uuids += [result["uuid"] for result in data["results"]]
+            if data["next"] is None:
+                break
+            response = user_client.get(data["next"])
+
+        assert len(uuids) == len(set(uuids)) == 10
+
+    def test_search_title_by_ngram(self, user_client):
+        post = PostFactory.create(title="제로콜라500ml 공동구매")
+        PostFactory.create(title="콜라제로 공동구매")
+        PostFactory.create(title="사이다 공동구매")
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"),
+            {"q": "제로콜라", "search_mode": "ngram"},
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["uuid"] for result in results] == [str(post.uuid)]
+
+    def test_search_title_by_ngram_after_update(self, user_client, post):
+        post.title = "제로콜라 공동구매"
+        post.save()
+
+        post.title = "사이다 공동구매"
+        post.save()
+
+        assert set(post.title_tokens.values_list("token", flat=True)) == (
+            search.tokenize("사이다 공동구매")
+        )
+        url = reverse("nanuri.posts.api:list")
+        response = user_client.get(url, {"q": "콜라", "search_mode": "ngram"})
+        assert response.json()["results"] == []
+        response = user_client.get(url, {"q": "사이다", "search_mode": "ngram"})
+        assert [x["uuid"] for x in response.json()["results"]] == [str(post.uuid)]
+
+    def test_search_with_invalid_mode(self, user_client):
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"),
+            {"q": "콜라", "search_mode": "unknown"},
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.skipif(
+        condition=settings.DATABASES["default"]["ENGINE"]
+        != "django.contrib.gis.db.backends.postgis",
+        reason="PostGIS 데이터베이스를 사용하지 않습니다",
+    )
+    def test_search_vector_is_updated_on_save(self, post):
+        post.title = "사이다 공동구매"
+        post.save()
+
+        assert Post.objects.search("사이다").filter(pk=post.pk).exists()
+
     def test_create(self, user_client, image_file):
         post = PostFactory.build()
         num_post_images = 3
@@ -141,6 +495,8 @@ class TestPostEndpoints:
         assert created_post.waited_from.strftime("%Y-%m-%d") == result["waited_from"]
         assert created_post.waited_until.strftime("%Y-%m-%d") == result["waited_until"]
         assert created_post.writer in created_post.participants.all()
+        assert created_post.num_participants == 1
+        assert created_post.location == created_post.writer.location
         assert len(created_post.images.all()) == num_post_images
 
     def test_create_without_attached_images(self, user_client, image_file):
@@ -182,6 +538,84 @@ class TestPostEndpoints:
         assert result["uuid"] == str(post.uuid)
         assert result["title"] == post.title
 
+    def test_retrieve_increments_view_count(self, user_client, post):
+        url = reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+        for count in range(1, 4):
+            response = user_client.get(url)
+            assert response.json()["view_count"] == post.view_count + count
+
+        assert view_count_buffer.pending_increments == 3
+        assert Post.objects.get(pk=post.pk).view_count == post.view_count
+
+        assert view_count_buffer.flush() == 3
+        assert view_count_buffer.pending_increments == 0
+        assert Post.objects.get(pk=post.pk).view_count == post.view_count + 3
+
+    def test_retrieve_with_writer_summary(self, user_client, post):
+        response = user_client.get(
+            reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+        )
+        writer = response.json()["writer"]
+
+        assert response.status_code == 200
+        assert set(writer.keys()) == {"uuid", "nickname", "profile"}
+        assert writer["uuid"] == str(post.writer.uuid)
+
+    def test_retrieve_with_expanded_writer(self, user_client, post):
+        response = user_client.get(
+            reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid}),
+            {"expand": "writer"},
+        )
+        writer = response.json()["writer"]
+
+        assert response.status_code == 200
+        assert writer["email"] == post.writer.email
+        assert writer["posts"] == [str(post.uuid)]
+
+    def test_retrieve_not_modified(
+        self, user_client, post, django_assert_max_num_queries
+    ):
+        url = reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+        response = user_client.get(url)
+        etag = response["ETag"]
+        assert response.status_code == 200
+        assert response["Last-Modified"]
+
+        with django_assert_max_num_queries(1):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert view_count_buffer.get_pending(post.pk) == 1
+
+    def test_retrieve_modified(self, user_client, user, post):
+        url = reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+        etag = user_client.get(url)["ETag"]
+
+        post.participants.add(user)
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+        etag = response["ETag"]
+        post.writer.nickname = "새 닉네임"
+        post.writer.save()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["writer"]["nickname"] == "새 닉네임"
+
+    def test_list_not_modified(self, user_client):
+        PostFactory.create_batch(size=3)
+        url = reverse("nanuri.posts.api:list")
+        etag = user_client.get(url)["ETag"]
+
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        PostFactory.create()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 4
+
     def test_update(self, user_client, post):
         new_post = PostFactory.build()
         fields = [
@@ -247,6 +681,61 @@ class TestPostEndpoints:
 
             assert len(result["images"]) == num_post_images
 
+    def test_update_without_images_keeps_post_images(self, user_client, post):
+        post_images = PostImageFactory.create_batch(size=2, post=post)
+
+        response = user_client.patch(
+            reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid}),
+            data={"title": "제목만 수정"},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert [x["uuid"] for x in response.json()["post_images"]] == [
+            str(post_image.uuid) for post_image in post_images
+        ]
+
+    def test_update_post_images_with_diff(
+        self, user_client, post, django_capture_on_commit_callbacks
+    ):
+        url = reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+        red, green, blue = (
+            make_image_file(color) for color in ("red", "green", "blue")
+        )
+        response = user_client.patch(url, data={"images": [red, green]})
+        kept, removed = response.json()["post_images"]
+        removed_name = PostImage.objects.get(uuid=removed["uuid"]).image.name
+
+        with CaptureQueriesContext(connection) as queries:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = user_client.patch(
+                    url, data={"kept_images": [kept["uuid"]], "images": [blue]}
+                )
+
+        assert response.status_code == 200
+        post_images = response.json()["post_images"]
+        assert len(post_images) == 2
+        assert post_images[0]["uuid"] == kept["uuid"]
+        assert not PostImage.objects.filter(uuid=removed["uuid"]).exists()
+        storage_cleaner.drain()
+        assert not default_storage.exists(removed_name)
+        deletes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith('DELETE FROM "posts_postimage"')
+        ]
+        assert len(deletes) == 1
+
+    def test_update_post_images_with_same_content(self, user_client, post):
+        url = reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+        response = user_client.patch(url, data={"images": [make_image_file("red")]})
+        uploaded = response.json()["post_images"]
+
+        response = user_client.patch(url, data={"images": [make_image_file("red")]})
+
+        assert response.json()["post_images"] == uploaded
+        assert post.images.count() == 1
+
     def test_destroy(self, user_client, post):
         assert Post.objects.filter(uuid=str(post.uuid)).count() == 1
         response = user_client.delete(
@@ -258,3 +747,37 @@ class TestPostEndpoints:
 
         assert response.status_code == 204
         assert Post.objects.filter(uuid=str(post.uuid)).count() == 0
+
+    def test_bulk_retrieve(self, user_client, django_assert_max_num_queries):
+        posts = PostFactory.create_batch(size=5)
+        for post in posts:
+            PostImageFactory.create(post=post)
+        missing_uuid = str(PostFactory.build().uuid)
+        uuids = [
+            str(posts[3].uuid),
+            missing_uuid,
+            str(posts[1].uuid),
+            str(posts[3].uuid),
+        ]
+
+        with django_assert_max_num_queries(3):
+            response = user_client.post(
+                reverse("nanuri.posts.api:bulk"), data={"uuids": uuids}, format="json"
+            )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert [x["uuid"] for x in result["results"]] == [
+            str(posts[3].uuid),
+            str(posts[1].uuid),
+        ]
+        assert len(result["results"][0]["post_images"]) == 1
+        assert result["missing"] == [missing_uuid]
+
+    def test_bulk_retrieve_too_many(self, user_client):
+        uuids = [str(post.uuid) for post in PostFactory.build_batch(size=501)]
+        response = user_client.post(
+            reverse("nanuri.posts.api:bulk"), data={"uuids": uuids}, format="json"
+        )
+
+        assert response.status_code == 400
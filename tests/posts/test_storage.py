@@ -0,0 +1,245 @@
+from datetime import timedelta
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from nanuri.posts import storage
+from nanuri.posts.models import ImageBlob, PostImage, StorageDeletion
+from nanuri.posts.storage import release_images, storage_cleaner, store_image
+
+from .factories import PostFactory, PostImageFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestStorageCleaner:
+    def test_destroy_deletes_files_after_commit(
+        self, user_client, post, django_capture_on_commit_callbacks
+    ):
+        post.image = default_storage.save("posts/image.txt", ContentFile(b"image"))
+        post.save()
+        post_image = PostImageFactory.create(
+            post=post,
+            image=default_storage.save("posts/images/image.txt", ContentFile(b"image")),
+        )
+        names = [post.image.name, post_image.image.name]
+        assert all(default_storage.exists(name) for name in names)
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            response = user_client.delete(
+                reverse("nanuri.posts.api:detail", kwargs={"uuid": post.uuid})
+            )
+
+        assert response.status_code == 204
+        assert callbacks
+        storage_cleaner.drain()
+        assert not any(default_storage.exists(name) for name in names)
+        assert not StorageDeletion.objects.exists()
+
+    def test_claimed_files_are_deleted_outside_lease(self, monkeypatch):
+        name = default_storage.save("posts/lease.txt", ContentFile(b"lease"))
+        storage_cleaner.enqueue([name])
+
+        def delete_files(names):
+            # 지우는 동안에는 다른 워커가 같은 파일을 가져가지 않음
+            assert storage_cleaner.claim_batch() == []
+            assert StorageDeletion.objects.get(name=name).next_attempt_at > (
+                timezone.now()
+            )
+            return []
+
+        monkeypatch.setattr(storage, "delete_files", delete_files)
+        assert storage_cleaner.drain() == (1, 0)
+        assert not StorageDeletion.objects.exists()
+
+    def test_failed_deletion_is_retried(self, monkeypatch):
+        name = default_storage.save("posts/retry.txt", ContentFile(b"retry"))
+        monkeypatch.setattr(storage, "delete_files", lambda names: list(names))
+
+        storage_cleaner.enqueue([name])
+        assert storage_cleaner.drain() == (0, 1)
+
+        deletion = StorageDeletion.objects.get(name=name)
+        assert deletion.attempts == 1
+        assert deletion.next_attempt_at > timezone.now()
+        # 대기 시간이 지나기 전에는 다시 시도하지 않음
+        assert storage_cleaner.drain() == (0, 0)
+
+        monkeypatch.undo()
+        StorageDeletion.objects.update(next_attempt_at=timezone.now())
+        assert storage_cleaner.drain() == (1, 0)
+        assert not default_storage.exists(name)
+        assert not StorageDeletion.objects.exists()
+
+    def test_sweep_orphaned_files(self, post):
+        post.image = default_storage.save("posts/sweep/image.txt", ContentFile(b"a"))
+        post.save()
+        post_image = PostImageFactory.create(
+            post=post,
+            image=default_storage.save("posts/sweep/images/a.txt", ContentFile(b"a")),
+        )
+        orphaned_name = default_storage.save(
+            "posts/sweep/images/orphaned.txt", ContentFile(b"orphaned")
+        )
+
+        assert storage_cleaner.sweep("posts/sweep", timedelta(days=1)) == []
+        assert storage_cleaner.sweep("posts/sweep", timedelta(0)) == [orphaned_name]
+        assert storage_cleaner.drain() == (1, 0)
+
+        assert not default_storage.exists(orphaned_name)
+        assert default_storage.exists(post.image.name)
+        assert default_storage.exists(post_image.image.name)
+
+
+class TestImageBlob:
+    def test_store_same_content_once(self):
+        first = store_image(SimpleUploadedFile("a.JPG", b"same"))
+        second = store_image(SimpleUploadedFile("b.jpg", b"same"))
+        other = store_image(SimpleUploadedFile("c.jpg", b"other"))
+
+        assert first == second != other
+        assert first.startswith("posts/blobs/") and first.endswith(".jpg")
+        assert ImageBlob.objects.get(name=first).ref_count == 2
+
+        release_images([(first, {})])
+        storage_cleaner.drain()
+        assert default_storage.exists(first)
+        assert ImageBlob.objects.get(name=first).ref_count == 1
+
+        release_images([(second, {})])
+        storage_cleaner.drain()
+        assert not default_storage.exists(first)
+        assert not ImageBlob.objects.filter(name=first).exists()
+
+    def test_store_after_release(self):
+        name = store_image(SimpleUploadedFile("a.jpg", b"again"))
+        release_images([(name, {})])
+
+        # 삭제 대기 중인 파일과 같은 내용을 다시 올리면 다른 이름으로 저장함
+        new_name = store_image(SimpleUploadedFile("b.jpg", b"again"))
+        assert new_name != name
+        storage_cleaner.drain()
+        assert not default_storage.exists(name)
+        assert default_storage.exists(new_name)
+        assert ImageBlob.objects.get(name=new_name).ref_count == 1
+
+    def test_cascade_delete_releases_images(
+        self, user, django_capture_on_commit_callbacks
+    ):
+        name = store_image(SimpleUploadedFile("a.jpg", b"cascade"))
+        post = PostFactory.create(writer=user, image=name)
+        PostImageFactory.create(
+            post=post, image=store_image(SimpleUploadedFile("b.jpg", b"cascade"))
+        )
+        PostImageFactory.create(
+            image=store_image(SimpleUploadedFile("c.jpg", b"cascade"))
+        )
+        assert ImageBlob.objects.get(name=name).ref_count == 3
+
+        # 작성자가 탈퇴하면 글과 첨부 이미지가 CASCADE 로 삭제됨
+        with django_capture_on_commit_callbacks(execute=True):
+            user.delete()
+
+        assert ImageBlob.objects.get(name=name).ref_count == 1
+        assert not StorageDeletion.objects.filter(name=name).exists()
+
+    def test_released_images_are_batched(
+        self, post, django_capture_on_commit_callbacks
+    ):
+        def count_queries(num_images):
+            for index in range(num_images):
+                PostImageFactory.create(
+                    post=post,
+                    image=store_image(SimpleUploadedFile("a.jpg", f"{index}".encode())),
+                )
+            with CaptureQueriesContext(connection) as context:
+                with django_capture_on_commit_callbacks(execute=True):
+                    PostImage.objects.filter(post=post).delete()
+            assert not ImageBlob.objects.exists()
+            return len(context.captured_queries)
+
+        # 지운 이미지 수와 상관없이 커밋 후에 한 번에 놓아줌
+        assert count_queries(2) == count_queries(4)
+
+    def test_rolled_back_delete_does_not_release(
+        self, post, django_capture_on_commit_callbacks
+    ):
+        name = store_image(SimpleUploadedFile("a.jpg", b"rollback"))
+        PostImageFactory.create(post=post, image=name)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    PostImage.objects.filter(post=post).delete()
+                    raise RuntimeError
+
+        assert ImageBlob.objects.get(name=name).ref_count == 1
+        assert PostImage.objects.filter(post=post).exists()
+
+    def test_failed_create_releases_stored_images(
+        self, user_client, image_file, monkeypatch
+    ):
+        def bulk_create(*args, **kwargs):
+            raise IntegrityError
+
+        monkeypatch.setattr(PostImage.objects, "bulk_create", bulk_create)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                reverse("nanuri.posts.api:list"),
+                data={
+                    "title": "실패",
+                    "unit_price": 1000,
+                    "quantity": 1,
+                    "description": "실패",
+                    "min_participants": 2,
+                    "max_participants": 4,
+                    "product_url": "https://example.com",
+                    "images": [image_file],
+                },
+                format="multipart",
+            )
+
+        # 파일은 트랜잭션 밖에서 올렸으므로 저장한 이미지를 놓아줌
+        assert not ImageBlob.objects.exists()
+        assert StorageDeletion.objects.exists()
+
+    def test_same_image_in_two_posts(
+        self, user_client, user, image_file, django_capture_on_commit_callbacks
+    ):
+        url = reverse("nanuri.posts.api:list")
+        uuids = []
+        for _ in range(2):
+            response = user_client.post(
+                url,
+                data={
+                    "title": "같은 사진",
+                    "unit_price": 1000,
+                    "quantity": 1,
+                    "description": "같은 사진",
+                    "min_participants": 2,
+                    "max_participants": 4,
+                    "product_url": "https://example.com",
+                    "image": image_file,
+                },
+                format="multipart",
+            )
+            assert response.status_code == 201
+            uuids.append(response.json()["uuid"])
+            image_file.seek(0)
+
+        [blob] = ImageBlob.objects.all()
+        assert blob.ref_count == 2
+
+        for index, uuid in enumerate(uuids):
+            with django_capture_on_commit_callbacks(execute=True):
+                user_client.delete(
+                    reverse("nanuri.posts.api:detail", kwargs={"uuid": uuid})
+                )
+            storage_cleaner.drain()
+            assert default_storage.exists(blob.name) == (index == 0)
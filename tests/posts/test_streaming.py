@@ -0,0 +1,121 @@
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+from channels.testing import HttpCommunicator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from nanuri.asgi import StreamingASGIHandler
+from nanuri.posts.models import Post
+
+from .factories import PostFactory, PostImageFactory
+
+TIMEOUT = 30
+
+
+@pytest.fixture
+def streaming(settings):
+    settings.LIST_STREAMING_THRESHOLD = 2
+    settings.LIST_STREAMING_CHUNK_SIZE = 3
+
+
+def read_streaming_json(response):
+    assert response.streaming
+    return json.loads(b"".join(response.streaming_content))
+
+
+@pytest.mark.django_db
+class TestStreamingPostList:
+    def test_list_is_same_as_rendered_list(self, user_client, settings):
+        for post in PostFactory.create_batch(size=7):
+            PostImageFactory.create(post=post)
+        url = reverse("nanuri.posts.api:list")
+
+        expected = user_client.get(url, {"limit": 5, "offset": 1}).json()
+        settings.LIST_STREAMING_THRESHOLD = 2
+        settings.LIST_STREAMING_CHUNK_SIZE = 3
+        response = user_client.get(url, {"limit": 5, "offset": 1})
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
+        assert read_streaming_json(response) == expected
+
+    def test_list_with_cursor_pagination(self, user_client, streaming):
+        posts = PostFactory.create_batch(size=8)
+        url = reverse("nanuri.posts.api:list") + "?cursor=&limit=3"
+        uuids = []
+        while url is not None:
+            result = read_streaming_json(user_client.get(url))
+            uuids.extend(post["uuid"] for post in result["results"])
+            url = result["next"]
+
+        expected = sorted(posts, key=lambda x: (x.created_at, x.id), reverse=True)
+        assert uuids == [str(post.uuid) for post in expected]
+
+    def test_small_page_is_not_streamed(self, user_client, streaming):
+        PostFactory.create_batch(size=3)
+        response = user_client.get(reverse("nanuri.posts.api:list"), {"limit": 2})
+
+        assert not response.streaming
+        assert len(response.json()["results"]) == 2
+
+    def test_nearest_with_large_limit_is_not_streamed(self, user, streaming):
+        user.location = "SRID=4326;POINT (127.0276 37.4979)"
+        user.save()
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+        PostFactory.create_batch(size=7, location="SRID=4326;POINT (127.0286 37.4989)")
+
+        response = user_client.get(
+            reverse("nanuri.posts.api:list"), {"nearest": 5, "limit": 201}
+        )
+
+        assert response.status_code == 200
+        assert not response.streaming
+        assert len(response.json()) == 5
+
+    def test_query_count_grows_with_chunks_only(self, user_client, streaming):
+        def count_queries(num_posts):
+            Post.objects.all().delete()
+            for post in PostFactory.create_batch(size=num_posts):
+                PostImageFactory.create(post=post)
+            with CaptureQueriesContext(connection) as context:
+                response = user_client.get(
+                    reverse("nanuri.posts.api:list"), {"limit": 100}
+                )
+                assert len(read_streaming_json(response)["results"]) == num_posts
+            return len(context.captured_queries)
+
+        # 페이지 크기와 상관없이 청크(3개)마다 같은 수의 쿼리를 실행함
+        counts = [count_queries(num_posts) for num_posts in (3, 6, 9)]
+        assert counts[2] - counts[1] == counts[1] - counts[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_streaming_list_under_asgi(settings):
+    settings.LIST_STREAMING_THRESHOLD = 2
+    settings.LIST_STREAMING_CHUNK_SIZE = 3
+    posts = await sync_to_async(PostFactory.create_batch)(size=5)
+    token = await sync_to_async(Token.objects.create)(user=posts[0].writer)
+
+    communicator = HttpCommunicator(
+        StreamingASGIHandler(),
+        "GET",
+        reverse("nanuri.posts.api:list") + "?limit=10",
+        headers=[
+            (b"host", b"testserver"),
+            (b"authorization", f"Token {token.key}".encode("ascii")),
+        ],
+    )
+    response = await communicator.get_response(timeout=TIMEOUT)
+
+    assert response["status"] == 200
+    result = json.loads(response["body"])
+    assert {post["uuid"] for post in result["results"]} == {
+        str(post.uuid) for post in posts
+    }
@@ -17,6 +17,29 @@ class TestSubCommentEndpoints:
         assert response.status_code == 200
         assert len(result["results"]) == len(sub_comments)
 
+    def test_list_with_cursor_pagination(self, user_client, comment):
+        sub_comments = SubCommentFactory.create_batch(comment=comment, size=7)
+        url = reverse("nanuri.posts.api:sub-comment-list") + "?cursor=&limit=3"
+        uuids = []
+        while url is not None:
+            result = user_client.get(url).json()
+            uuids.extend(sub_comment["uuid"] for sub_comment in result["results"])
+            url = result["next"]
+
+        assert sorted(uuids) == sorted(str(x.uuid) for x in sub_comments)
+
+    def test_list_by_comment_newest_first(self, user_client, comment):
+        sub_comments = SubCommentFactory.create_batch(comment=comment, size=3)
+        SubCommentFactory.create()
+        response = user_client.get(
+            reverse("nanuri.posts.api:sub-comment-list"),
+            {"comment": str(comment.uuid), "ordering": "newest"},
+        )
+
+        assert [x["uuid"] for x in response.json()["results"]] == [
+            str(sub_comment.uuid) for sub_comment in reversed(sub_comments)
+        ]
+
     def test_create(self, user_client, user):
         comment = CommentFactory.create()
         sub_comment = SubCommentFactory.build(comment=comment)
@@ -0,0 +1,110 @@
+import pytest
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from nanuri.posts.models import PostImage
+
+from .factories import PostFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def upload(upload_form, image_file):
+    # 업로드 폼으로 저장소에 바로 올리는 클라이언트를 흉내냄 (인증 없음)
+    return APIClient().post(
+        upload_form["url"],
+        data={**upload_form["fields"], "file": image_file},
+        format="multipart",
+    )
+
+
+class TestPostUploads:
+    def test_upload_and_confirm(
+        self, user_client, user, image_file, django_capture_on_commit_callbacks
+    ):
+        post = PostFactory.create(writer=user)
+        response = user_client.post(
+            reverse("nanuri.posts.api:uploads", kwargs={"uuid": post.uuid}),
+            data={"content_types": ["image/jpeg", "image/png"]},
+            format="json",
+        )
+        assert response.status_code == 200
+        upload_forms = response.json()
+        assert len(upload_forms) == 2
+        for upload_form in upload_forms:
+            assert upload_form["key"].startswith(f"posts/{post.uuid}/")
+            assert upload(upload_form, image_file).status_code == 204
+            assert default_storage.exists(upload_form["key"])
+
+        image_key, attached_key = (x["key"] for x in upload_forms)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = user_client.post(
+                reverse("nanuri.posts.api:upload-confirm", kwargs={"uuid": post.uuid}),
+                data={"image": image_key, "images": [attached_key]},
+                format="json",
+            )
+
+        assert response.status_code == 200
+        post.refresh_from_db()
+        assert post.image.name == image_key
+        assert list(post.images.values_list("image", flat=True)) == [attached_key]
+        # 커밋 후 이미지 변형도 만들어짐
+        assert post.image_variants
+
+    def test_upload_by_other_user(self, user_client, post):
+        response = user_client.post(
+            reverse("nanuri.posts.api:uploads", kwargs={"uuid": post.uuid}),
+            data={"content_types": ["image/jpeg"]},
+            format="json",
+        )
+
+        assert response.status_code == 403
+
+    def test_upload_with_invalid_content_type(self, user_client, user):
+        post = PostFactory.create(writer=user)
+        response = user_client.post(
+            reverse("nanuri.posts.api:uploads", kwargs={"uuid": post.uuid}),
+            data={"content_types": ["application/pdf"]},
+            format="json",
+        )
+
+        assert response.status_code == 400
+
+    def test_upload_with_tampered_form(self, user_client, user, image_file):
+        post = PostFactory.create(writer=user)
+        [upload_form] = user_client.post(
+            reverse("nanuri.posts.api:uploads", kwargs={"uuid": post.uuid}),
+            data={"content_types": ["image/jpeg"]},
+            format="json",
+        ).json()
+        upload_form["fields"]["key"] = "posts/other.jpg"
+
+        assert upload(upload_form, image_file).status_code == 403
+        assert not default_storage.exists("posts/other.jpg")
+
+    def test_local_upload_is_disabled_with_s3_backend(
+        self, user_client, user, image_file, settings
+    ):
+        post = PostFactory.create(writer=user)
+        [upload_form] = user_client.post(
+            reverse("nanuri.posts.api:uploads", kwargs={"uuid": post.uuid}),
+            data={"content_types": ["image/jpeg"]},
+            format="json",
+        ).json()
+        settings.UPLOADS_BACKEND = "nanuri.uploads.S3UploadBackend"
+
+        assert upload(upload_form, image_file).status_code == 404
+        assert not default_storage.exists(upload_form["key"])
+
+    def test_confirm_not_uploaded(self, user_client, user):
+        post = PostFactory.create(writer=user)
+        for key in [f"posts/{post.uuid}/missing.jpg", "posts/other/image.jpg"]:
+            response = user_client.post(
+                reverse("nanuri.posts.api:upload-confirm", kwargs={"uuid": post.uuid}),
+                data={"images": [key]},
+                format="json",
+            )
+
+            assert response.status_code == 400
+        assert not PostImage.objects.filter(post=post).exists()
@@ -1,7 +1,11 @@
+import json
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import check_password
+from django.core.files.storage import default_storage
 from django.urls import reverse
+from rest_framework.test import APIClient
 
 from .factories import UserFactory
 
@@ -26,6 +30,40 @@ class TestUserEndpoints:
         assert response.status_code == 200
         assert len(response.json()["results"]) == 20
 
+    def test_list_with_cursor_pagination(self, user_client, user):
+        users = [user] + UserFactory.create_batch(size=12)
+        url = reverse("nanuri.users.api:list") + "?cursor=&limit=5"
+        uuids = []
+        while url is not None:
+            response = user_client.get(url)
+            result = response.json()
+
+            assert response.status_code == 200
+            assert "count" not in result
+            uuids.extend(x["uuid"] for x in result["results"])
+            url = result["next"]
+
+        expected = sorted(users, key=lambda x: (x.created_at, x.id))
+        assert uuids == [str(x.uuid) for x in expected]
+
+    def test_list_streaming(self, user_client, user, settings):
+        settings.LIST_STREAMING_THRESHOLD = 2
+        settings.LIST_STREAMING_CHUNK_SIZE = 2
+        users = [user] + UserFactory.create_batch(size=6)
+        url = reverse("nanuri.users.api:list") + "?cursor=&limit=5"
+        uuids = []
+        while url is not None:
+            response = user_client.get(url)
+
+            assert response.status_code == 200
+            assert response.streaming
+            result = json.loads(b"".join(response.streaming_content))
+            uuids.extend(x["uuid"] for x in result["results"])
+            url = result["next"]
+
+        expected = sorted(users, key=lambda x: (x.created_at, x.id))
+        assert uuids == [str(x.uuid) for x in expected]
+
     def test_list_with_nickname(self, user_client):
         users = UserFactory.create_batch(size=3)
         user = users[0]
@@ -91,6 +129,18 @@ class TestUserEndpoints:
         assert len(posts_participated) == 1
         assert posts_participated[0] == str(post.uuid)
 
+    def test_retrieve_not_modified(self, user_client, user, post):
+        url = reverse("nanuri.users.api:detail", kwargs={"uuid": user.uuid})
+        etag = user_client.get(url)["ETag"]
+
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        user.favorite_posts.add(post)
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["favorite_posts"] == [str(post.uuid)]
+
     def test_update(self, user_client, user):
         new_user = UserFactory.build()
         new_password = "password1234"
@@ -161,3 +211,43 @@ class TestUserEndpoints:
 
         assert response.status_code == 204
         assert get_user_model().objects.filter(uuid=str(user.uuid)).count() == 0
+
+    def test_upload_profile(self, user_client, user, image_file):
+        response = user_client.post(
+            reverse("nanuri.users.api:profile-upload", kwargs={"uuid": user.uuid}),
+            data={"content_type": "image/jpeg"},
+            format="json",
+        )
+        assert response.status_code == 200
+        upload_form = response.json()
+        response = APIClient().post(
+            upload_form["url"],
+            data={**upload_form["fields"], "file": image_file},
+            format="multipart",
+        )
+        assert response.status_code == 204
+
+        response = user_client.post(
+            reverse(
+                "nanuri.users.api:profile-upload-confirm", kwargs={"uuid": user.uuid}
+            ),
+            data={"key": upload_form["key"]},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.profile.name == upload_form["key"]
+        assert default_storage.exists(user.profile.name)
+
+    def test_upload_profile_of_other_user(self, user_client):
+        other_user = UserFactory.create()
+        response = user_client.post(
+            reverse(
+                "nanuri.users.api:profile-upload", kwargs={"uuid": other_user.uuid}
+            ),
+            data={"content_type": "image/jpeg"},
+            format="json",
+        )
+
+        assert response.status_code == 403